@@ -0,0 +1,58 @@
+"""Per-class cost of the done-class store as its history grows.
+
+Run from the ``script`` directory:
+
+    python -m benchmarks.bench_dedupe_store
+"""
+import os
+import time
+import random
+import tempfile
+
+from utils.dedupe_store import DoneClassStore
+
+
+HISTORY_SIZES = [1_000, 10_000, 100_000, 250_000]
+CLASSES_PER_RUN = 500
+
+
+def bench(history_size: int, workdir: str) -> tuple[float, float, float]:
+    legacy_path = os.path.join(workdir, f"done_{history_size}.txt")
+    db_path = os.path.join(workdir, f"done_{history_size}.db")
+    with open(legacy_path, "w", encoding='utf-8') as f:
+        f.writelines(f"{10_000_000 + i}\n" for i in range(history_size))
+
+    start = time.perf_counter()
+    store = DoneClassStore(db_path=db_path, legacy_path=legacy_path)
+    store.close()
+    migrate_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = DoneClassStore(db_path=db_path, legacy_path=legacy_path)
+    load_s = time.perf_counter() - start
+
+    # Half of the run's classes are already known, half are new.
+    known = random.sample(range(history_size), CLASSES_PER_RUN // 2)
+    class_ids = [str(10_000_000 + i) for i in known]
+    class_ids += [str(90_000_000 + i) for i in range(CLASSES_PER_RUN // 2)]
+    random.shuffle(class_ids)
+
+    start = time.perf_counter()
+    for class_id in class_ids:
+        if class_id not in store:
+            store.add(class_id)
+    store.close()
+    per_class_us = (time.perf_counter() - start) / len(class_ids) * 1_000_000
+    return migrate_s, load_s, per_class_us
+
+
+def main():
+    print(f"{'history':>10} {'migrate (s)':>12} {'load (s)':>10} {'per class (us)':>15}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in HISTORY_SIZES:
+            migrate_s, load_s, per_class_us = bench(size, workdir)
+            print(f"{size:>10} {migrate_s:>12.3f} {load_s:>10.3f} {per_class_us:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
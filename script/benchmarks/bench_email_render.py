@@ -0,0 +1,59 @@
+"""Email rendering cost as class rosters grow.
+
+Renders ``--emails`` enrollment emails with 1 to 200 students each and reports
+throughput per roster size. Run from the ``script`` directory:
+
+    python -m benchmarks.bench_email_render [--emails 10000]
+"""
+import time
+import random
+import argparse
+
+from utils.models import ClassDetails, Student
+from utils.mail_sender.email_generator import generate_email
+
+
+ROSTER_SIZES = [1, 10, 50, 100, 200]
+CLASS_INFO = ClassDetails(date="03-14-2026 | 09:00 am", location="640 Spence Lane, Nashville, TN, US")
+
+
+def make_students(count: int) -> list[Student]:
+    return [
+        Student(
+            id=str(i),
+            name=f"Student{i} O'Brien & Co",
+            email=f"student{i}@example.com",
+            phone=f"615555{i:04d}"
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'students':>9} {'emails':>7} {'total (s)':>10} {'per email (us)':>15} {'avg size (KB)':>14}")
+    for size in ROSTER_SIZES:
+        students = make_students(size)
+        start = time.perf_counter()
+        total_bytes = 0
+        for _ in range(args.emails // len(ROSTER_SIZES)):
+            total_bytes += len(generate_email("Jane Instructor", students, CLASS_INFO))
+        elapsed = time.perf_counter() - start
+        count = args.emails // len(ROSTER_SIZES)
+        print(f"{size:>9} {count:>7} {elapsed:>10.3f} {elapsed / count * 1e6:>15.1f} "
+              f"{total_bytes / count / 1024:>14.1f}")
+
+    mixed = [make_students(random.randint(1, 200)) for _ in range(100)]
+    start = time.perf_counter()
+    for i in range(args.emails):
+        generate_email("Jane Instructor", mixed[i % len(mixed)], CLASS_INFO)
+    elapsed = time.perf_counter() - start
+    print(f"mixed 1-200 students: {args.emails} emails in {elapsed:.3f}s "
+          f"({args.emails / elapsed:.0f} emails/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Cold and warm time-to-token for the browser login path.
+
+Needs Chrome and valid AHA credentials in ``.env``. Run from the ``script`` directory:
+
+    python -m benchmarks.bench_login [--runs N]
+
+"cold" drops the cached chromedriver resolution and the cached JWT before
+logging in; "warm" keeps the driver cache but still forces a browser login;
+"cached token" is the path a rerun takes while the stored JWT is valid.
+
+The token and driver cache live in a temporary directory, so the live
+``DATA_DIR/token.json`` and ``chromedriver.json`` are left alone.
+"""
+import os
+import time
+import argparse
+import tempfile
+
+from utils import util
+from utils import token_manager
+
+
+def time_to_token(force_login: bool) -> float:
+    util.PHASE_TIMINGS.clear()
+    start = time.perf_counter()
+    token = token_manager.get_jwt_token(force_login=force_login)
+    elapsed = time.perf_counter() - start
+    if not token:
+        raise SystemExit("Login did not produce a token; check credentials and Chrome.")
+    return elapsed
+
+
+def report(label: str, elapsed: float):
+    phases = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in util.PHASE_TIMINGS.items())
+    print(f"{label:<14} {elapsed:7.2f}s  {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        util.DRIVER_CACHE_PATH = os.path.join(workdir, "chromedriver.json")
+        token_manager.TOKEN_PATH = os.path.join(workdir, "token.json")
+        report("cold", time_to_token(force_login=True))
+
+        for run in range(args.runs):
+            report(f"warm #{run + 1}", time_to_token(force_login=True))
+
+        report("cached token", time_to_token(force_login=False))
+
+
+if __name__ == "__main__":
+    main()
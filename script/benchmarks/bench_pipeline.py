@@ -0,0 +1,171 @@
+"""End-to-end pipeline benchmark against the local Atlas/Brevo stand-in.
+
+Starts ``benchmarks.mock_server`` in-process, points the API modules at it
+and runs ``main.run_pipeline`` with throwaway stores. Run from the ``script``
+directory:
+
+    python -m benchmarks.bench_pipeline --classes 500 --latency-ms 30 --runs 2
+
+The first run starts from empty stores; later runs show the steady state
+where unchanged classes are skipped.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+from benchmarks.mock_server import MockDataset, MockServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")
+            ]
+
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--instructors", type=int, default=40)
+    parser.add_argument("--max-students", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--brevo-error-rate", type=float, default=0.0,
+                        help="share of Brevo sends answered with 429/503 and Retry-After")
+    parser.add_argument("--atlas-rate", type=float, default=200.0, help="Atlas limiter start/max req/s")
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--full-scan", action="store_true", help="re-check every class on each run, as full runs do")
+    parser.add_argument("--no-etags", action="store_true", help="mock gateway never answers 304")
+    args = parser.parse_args()
+
+    dataset = MockDataset(classes=args.classes, instructors=args.instructors, max_students=args.max_students)
+    server = MockServer(dataset, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                        brevo_error_rate=args.brevo_error_rate, etags=not args.no_etags).start()
+
+    # Must be set before the pipeline modules are imported; they read it at import time.
+    os.environ.update({
+        "ATLAS_API_BASE": server.base_url,
+        "BREVO_API_BASE": server.base_url,
+        "ATLAS_RATE_INITIAL": str(args.atlas_rate),
+        "ATLAS_RATE_MAX": str(args.atlas_rate),
+        "ATLAS_RATE_BURST": str(max(1, int(args.atlas_rate // 10))),
+        "BREVO_RATE_PER_SECOND": "1000",
+        # Short backoff so injected Brevo errors are retried within the drain window.
+        "OUTBOX_BACKOFF_BASE_SECONDS": "0.1",
+        "OUTBOX_BACKOFF_MAX_SECONDS": "1",
+        "NATHAN_EMAIL": "nathan@example.com",
+        "SENDER_EMAIL": "sender@example.com",
+        "BREVO_API_KEY": "mock",
+    })
+    import main as pipeline
+    from utils import metrics
+    from utils.http_client import get_atlas_session, get_brevo_session, close_sessions, atlas_response_cache
+    from utils.dedupe_store import DoneClassStore
+    from utils.snapshot_store import ClassSnapshotStore
+    from utils.mail_sender.outbox import Outbox, OutboxDispatcher
+    from utils.apis.get_instructor_info import instructor_cache
+    from utils.apis.get_coordinator_info import coordinator_cache
+    from utils.apis.get_classes import page_size_tuner
+
+    instructor_cache.invalidate()
+    coordinator_cache.invalidate()
+    jwt_token = "mock.eyJleHAiOjQxMDI0NDQ4MDB9.mock"
+    atlas_latencies, brevo_latencies = [], []
+    get_atlas_session(jwt_token).hooks["response"].append(
+        lambda r, *a, **k: atlas_latencies.append(r.elapsed.total_seconds()))
+    get_brevo_session().hooks["response"].append(
+        lambda r, *a, **k: brevo_latencies.append(r.elapsed.total_seconds()))
+
+    non_empty = sum(1 for cls in dataset.classes if cls["occupiedSeats"])
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        atlas_response_cache.directory = os.path.join(workdir, "http_cache")
+        page_size_tuner.path = os.path.join(workdir, "page_size.json")
+        for run in range(1, args.runs + 1):
+            server.requests.clear()
+            server.emails_sent = 0
+            server.not_modified = 0
+            server.brevo_errors = 0
+            atlas_latencies.clear()
+            brevo_latencies.clear()
+            metrics.reset()
+
+            done_classes = DoneClassStore(db_path=db_path, legacy_path=None)
+            snapshots = ClassSnapshotStore(db_path=db_path)
+            outbox = Outbox(db_path=db_path)
+            dispatcher = OutboxDispatcher(outbox, poll_interval=0.05)
+            dispatcher.start()
+            start = time.perf_counter()
+            pipeline.run_pipeline(jwt_token, done_classes, snapshots, outbox, dispatcher, args.full_scan)
+            dispatcher.stop(drain_seconds=5)
+            elapsed = time.perf_counter() - start
+            done_classes.close()
+            snapshots.close()
+            outbox.close()
+
+            total_requests = sum(server.requests.values())
+            print(f"\n=== run {run} ===")
+            print(f"classes listed: {len(dataset.classes)} ({non_empty} with students)")
+            print(f"wall time: {elapsed:.2f}s  classes/sec: {non_empty / elapsed:.1f}")
+            print(f"requests: {total_requests}  per class: {total_requests / max(1, non_empty):.2f}  "
+                  f"emails delivered: {server.emails_sent}  304 answers: {server.not_modified}  "
+                  f"Brevo errors injected: {server.brevo_errors}")
+            for endpoint, count in sorted(server.requests.items()):
+                print(f"  {endpoint:<26} {count}")
+            for label, values in (("atlas", atlas_latencies), ("brevo", brevo_latencies)):
+                if values:
+                    print(f"{label} latency ms: p50={percentile(values, 50) * 1000:.1f} "
+                          f"p99={percentile(values, 99) * 1000:.1f} "
+                          f"mean={statistics.mean(values) * 1000:.1f}")
+            for stage, stats in metrics.report()["stages"].items():
+                print(f"  stage {stage:<22} n={stats['count']:<5} total={stats['total_seconds']:.2f}s "
+                      f"mean={stats['mean_seconds'] * 1000:.1f}ms")
+            print(f"response cache: {atlas_response_cache.stats()}")
+            peak = peak_rss_mb()
+            print(f"peak RSS: {peak:.1f} MB" if peak is not None else "peak RSS: unavailable")
+
+    close_sessions()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Cold-start benchmark for the entry point.
+
+Every sample runs in a fresh interpreter, as a poll run or a restarted
+container would. It measures:
+
+- the time to ``import main`` and whether that pulled in the browser stack
+  (selenium / webdriver_manager must only load when a browser login runs);
+- the time from starting ``main.py --once`` to its first Atlas request,
+  against the local stand-in with a cached token (so no browser login).
+
+Run from the ``script`` directory:
+
+    python -m benchmarks.bench_startup --runs 5 [--importtime 15]
+
+Exits non-zero when a browser module is imported at startup or a median
+exceeds ``--max-import-ms`` / ``--max-first-request-ms``, so it can guard
+against startup regressions.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks.mock_server import MockDataset, MockServer
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Top-level packages that only the login path may import.
+LAZY_PACKAGES = ("selenium", "webdriver_manager")
+MOCK_TOKEN = "mock.eyJleHAiOjQxMDI0NDQ4MDB9.mock"
+IMPORT_PROBE = (
+    "import sys, time, json\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({LAZY_PACKAGES!r}))\n"
+    "print(json.dumps({'seconds': elapsed, 'lazy_loaded': loaded}))\n"
+)
+
+
+def probe_env(data_dir: str, extra: dict = None) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATA_DIR": data_dir,
+        "NATHAN_EMAIL": "nathan@example.com",
+        "SENDER_EMAIL": "sender@example.com",
+        "BREVO_API_KEY": "mock",
+    })
+    env.update(extra or {})
+    return env
+
+
+def measure_import(data_dir: str) -> dict:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=SCRIPT_DIR, env=probe_env(data_dir),
+                            capture_output=True, text=True, check=True)
+    process_seconds = time.perf_counter() - start
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_seconds"] = process_seconds
+    return sample
+
+
+def measure_first_request(server: MockServer, data_dir: str, timeout: float) -> tuple[float, float]:
+    """Seconds from spawning ``main.py --once`` to the stand-in's first request, and to process exit."""
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "token.json"), "w", encoding='utf-8') as f:
+        json.dump({"userToken": MOCK_TOKEN}, f)
+    env = probe_env(data_dir, {
+        "ATLAS_API_BASE": server.base_url,
+        "BREVO_API_BASE": server.base_url,
+        "BREVO_RATE_PER_SECOND": "1000",
+        "OUTBOX_DRAIN_SECONDS": "1",
+    })
+    server.first_request_at = None
+    start = time.time()
+    subprocess.run([sys.executable, "main.py", "--once"], cwd=SCRIPT_DIR, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+    finished = time.time() - start
+    if server.first_request_at is None:
+        raise SystemExit("main.py --once finished without calling the stand-in; check its output.")
+    return server.first_request_at - start, finished
+
+
+def slowest_imports(data_dir: str, count: int) -> list[tuple[int, int, str]]:
+    """(self us, cumulative us, module) for the ``count`` slowest modules by self time."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=SCRIPT_DIR,
+                            env=probe_env(data_dir), capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(own), int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--classes", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="also list the N slowest modules from python -X importtime")
+    parser.add_argument("--max-import-ms", type=float, default=500.0, help="fail above this median import time")
+    parser.add_argument("--max-first-request-ms", type=float, default=2000.0,
+                        help="fail above this median time to the first Atlas request")
+    args = parser.parse_args()
+
+    server = MockServer(MockDataset(classes=args.classes), latency_ms=args.latency_ms).start()
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = [measure_import(os.path.join(workdir, f"import-{run}")) for run in range(args.runs)]
+        first_requests, totals = [], []
+        for run in range(args.runs):
+            first_request, total = measure_first_request(server, os.path.join(workdir, f"run-{run}"), timeout=120)
+            first_requests.append(first_request)
+            totals.append(total)
+        slowest = slowest_imports(os.path.join(workdir, "importtime"), args.importtime) if args.importtime else []
+    server.stop()
+
+    import_ms = statistics.median(sample["seconds"] for sample in imports) * 1000
+    process_ms = statistics.median(sample["process_seconds"] for sample in imports) * 1000
+    first_request_ms = statistics.median(first_requests) * 1000
+    lazy_loaded = sorted({name for sample in imports for name in sample["lazy_loaded"]})
+
+    print(f"import main:           median {import_ms:.0f} ms  (min {min(s['seconds'] for s in imports) * 1000:.0f} ms)")
+    print(f"interpreter + import:  median {process_ms:.0f} ms")
+    print(f"first Atlas request:   median {first_request_ms:.0f} ms after spawn")
+    print(f"--once run ({args.classes} classes): median {statistics.median(totals):.2f}s")
+    print(f"browser modules at startup: {', '.join(lazy_loaded) or 'none'}")
+    for own, cumulative, name in slowest:
+        print(f"  {name:<45} self {own / 1000:6.1f} ms  cumulative {cumulative / 1000:6.1f} ms")
+
+    if lazy_loaded:
+        failures.append(f"{', '.join(lazy_loaded)} imported at startup")
+    if import_ms > args.max_import_ms:
+        failures.append(f"import main took {import_ms:.0f} ms (budget {args.max_import_ms:.0f} ms)")
+    if first_request_ms > args.max_first_request_ms:
+        failures.append(f"first request after {first_request_ms:.0f} ms (budget {args.max_first_request_ms:.0f} ms)")
+    if failures:
+        raise SystemExit("Startup regression: " + "; ".join(failures))
+    print("Startup within budget.")
+
+
+if __name__ == "__main__":
+    main()
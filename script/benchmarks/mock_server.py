@@ -0,0 +1,277 @@
+"""Local stand-in for the Atlas gateway and Brevo's smtp/email endpoint.
+
+Serves a generated dataset with configurable latency and error rate so the
+pipeline can be measured without touching production. Run standalone from the
+``script`` directory:
+
+    python -m benchmarks.mock_server --port 8765 --classes 500
+
+then point a run at it with ATLAS_API_BASE/BREVO_API_BASE=http://127.0.0.1:8765.
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockDataset:
+    def __init__(self, classes: int = 200, instructors: int = 40, organisations: int = 5,
+                 max_students: int = 30, empty_ratio: float = 0.3, seed: int = 7):
+        rng = random.Random(seed)
+        self.organisations = [(f"ORG{i:03d}", "TS") for i in range(organisations)]
+        self.instructors = {
+            f"INS{i:05d}": (f"instructor{i}@example.com", *rng.choice(self.organisations))
+            for i in range(instructors)
+        }
+        instructor_ids = list(self.instructors)
+        self.classes = []
+        self.students = {}
+        start_ms = int(time.time() * 1000) + 86_400_000
+        for i in range(classes):
+            class_id = str(20_000_000 + i)
+            seats = 0 if rng.random() < empty_ratio else rng.randint(1, max_students)
+            instructor_id = rng.choice(instructor_ids)
+            self.classes.append({
+                "classId": class_id,
+                "occupiedSeats": seats,
+                "startDateTime": start_ms + i * 3_600_000,
+                "primaryInstructor": {"instructorId": instructor_id, "instructorName": f"Instructor {instructor_id}"}
+            })
+            self.students[class_id] = [
+                {
+                    "studentId": f"{class_id}-{n}",
+                    "firstName": f"First{n}",
+                    "lastName": f"Last{n}",
+                    "emailId": f"student{n}.{class_id}@example.com",
+                    "phoneNumber": f"615555{n:04d}"
+                }
+                for n in range(seats)
+            ]
+        self.class_index = {cls["classId"]: cls for cls in self.classes}
+
+
+class MockServer:
+    """Threaded HTTP server; ``requests`` counts calls per endpoint, ``not_modified`` the 304 answers
+    and ``brevo_errors`` the injected Brevo failures.
+
+    ``first_request_at`` is the wall-clock time of the first request received.
+    """
+
+    def __init__(self, dataset: MockDataset, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: float = 20.0, jitter_ms: float = 10.0, error_rate: float = 0.0,
+                 brevo_latency_ms: float = 50.0, brevo_error_rate: float = 0.0, etags: bool = True):
+        self.dataset = dataset
+        self.etags = etags
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.brevo_latency_ms = brevo_latency_ms
+        self.brevo_error_rate = brevo_error_rate
+        self.requests = Counter()
+        self.emails_sent = 0
+        self.not_modified = 0
+        self.brevo_errors = 0
+        self.first_request_at = None
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _count(self, endpoint: str):
+        with self._lock:
+            if self.first_request_at is None:
+                self.first_request_at = time.time()
+            self.requests[endpoint] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: dict, headers: dict = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _delay(self, base_ms: float):
+                delay = base_ms + random.uniform(-server.jitter_ms, server.jitter_ms)
+                time.sleep(max(0.0, delay) / 1000)
+
+            def do_POST(self):
+                body = self._read_body()
+                url = urlparse(self.path)
+                if url.path.endswith("/v3/smtp/email"):
+                    server._count("smtp/email")
+                    self._delay(server.brevo_latency_ms)
+                    if random.random() < server.brevo_error_rate:
+                        with server._lock:
+                            server.brevo_errors += 1
+                        if random.random() < 0.5:
+                            self._reply(429, {"code": "too_many_requests"}, {"Retry-After": "1"})
+                        else:
+                            self._reply(503, {"code": "unavailable"}, {"Retry-After": "0"})
+                        return
+                    versions = json.loads(body or b"{}").get("messageVersions") or [None]
+                    with server._lock:
+                        server.emails_sent += len(versions)
+                    self._reply(201, {"messageIds": [f"<mock-{time.time_ns()}-{i}@mock>" for i in range(len(versions))]})
+                elif url.path.endswith("/getClasses"):
+                    self._atlas("getClasses", lambda: self._get_classes(url, body))
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                parts = url.path.rstrip("/").split("/")
+                if url.path.endswith("/students"):
+                    self._atlas("classes/{id}/students", lambda: self._students(parts[-2], url))
+                elif len(parts) >= 2 and parts[-2] == "classes":
+                    self._atlas("classes/{id}", lambda: self._class(parts[-1]), conditional=server.etags)
+                elif url.path.endswith("/organisation/alignments"):
+                    self._atlas("organisation/alignments", lambda: self._alignments(url))
+                elif url.path.endswith("/organisation"):
+                    self._atlas("organisation", lambda: self._organisation(url))
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def _atlas(self, endpoint: str, build, conditional: bool = False):
+                server._count(endpoint)
+                self._delay(server.latency_ms)
+                if random.random() < server.error_rate:
+                    self._reply(503, {"error": "injected"}, {"Retry-After": "0"})
+                    return
+                status, body = build()
+                if not conditional or status != 200:
+                    self._reply(status, body)
+                    return
+                etag = '"%s"' % hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._reply(status, body, {"ETag": etag})
+
+            def _get_classes(self, url, body: bytes):
+                query = parse_qs(url.query)
+                filters = json.loads(body or b"{}").get("classFilters", {})
+                size = int(filters.get("size") or query.get("size", ["100"])[0])
+                page = int(filters.get("page", query.get("page", ["0"])[0]))
+                classes = server.dataset.classes
+                window_start, window_end = filters.get("classStartDate"), filters.get("classEndDate")
+                if window_start is not None and window_end is not None:
+                    # The gateway's window covers whole days: classEndDate is the start of the last day.
+                    classes = [cls for cls in classes
+                               if window_start <= cls["startDateTime"] < window_end + 86_400_000]
+                items = classes[page * size:(page + 1) * size]
+                total_pages = max(1, -(-len(classes) // size))
+                return 200, {"data": {
+                    "items": items,
+                    "pagination": {
+                        "isLast": page >= total_pages - 1,
+                        "totalPages": total_pages,
+                        "totalElements": len(classes)
+                    }
+                }}
+
+            def _class(self, class_id: str):
+                cls = server.dataset.class_index.get(class_id)
+                if cls is None:
+                    return 404, {"error": "class not found"}
+                return 200, {"data": {"class": {
+                    "locationDetails": {"addressDetails": {
+                        "streetLine1": "640 Spence Lane", "city": "Nashville", "state": "TN", "country": "US"
+                    }},
+                    "scheduleInfoDetails": {"classStartDate": cls["startDateTime"]}
+                }}}
+
+            def _students(self, class_id: str, url):
+                query = parse_qs(url.query)
+                page = int(query.get("page", ["1"])[0])
+                size = int(query.get("size", ["10"])[0])
+                students = server.dataset.students.get(class_id, [])
+                items = students[(page - 1) * size:page * size]
+                total_pages = max(1, -(-len(students) // size))
+                return 200, {"data": {"students": {
+                    "items": items,
+                    "pagination": {"isLast": page >= total_pages, "totalPages": total_pages}
+                }}}
+
+            def _alignments(self, url):
+                instructor_id = parse_qs(url.query).get("nameOrEmailOrInstructorId", [""])[0]
+                instructor = server.dataset.instructors.get(instructor_id)
+                if instructor is None:
+                    return 200, {"data": {"items": []}}
+                email, org_code, org_type = instructor
+                return 200, {"data": {"items": [{"email": email, "orgType": org_type, "orgCode": org_code}]}}
+
+            def _organisation(self, url):
+                org_code = parse_qs(url.query).get("orgCodeOrName", [""])[0]
+                return 200, {"data": {"items": [
+                    {"organisationProfile": {"coordinator": {"email": f"coordinator.{org_code.lower()}@example.com"}}}
+                ]}}
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--classes", type=int, default=200)
+    parser.add_argument("--instructors", type=int, default=40)
+    parser.add_argument("--max-students", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--brevo-error-rate", type=float, default=0.0,
+                        help="share of smtp/email calls answered with 429/503 and Retry-After")
+    parser.add_argument("--no-etags", action="store_true", help="never answer class details with 304")
+    args = parser.parse_args()
+
+    dataset = MockDataset(classes=args.classes, instructors=args.instructors, max_students=args.max_students)
+    server = MockServer(dataset, port=args.port, latency_ms=args.latency_ms, error_rate=args.error_rate,
+                        brevo_error_rate=args.brevo_error_rate, etags=not args.no_etags).start()
+    print(f"Mock Atlas/Brevo listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
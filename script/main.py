@@ -1,118 +1,244 @@
 import os
 import time
-import random
+import hashlib
+import logging
+import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 
-from utils.apis.get_classes import get_classes
-from utils.apis.get_class_info import get_class_details
-from utils.apis.get_instructor_info import get_instructor_email
-from utils.apis.get_coordinator_info import get_coordinator_email
+from utils.apis.get_classes import iter_classes
+from utils.enrichment import enrich_classes
+from utils.apis.get_instructor_info import instructor_cache
+from utils.apis.get_coordinator_info import coordinator_cache
 
-from utils.mail_sender.email_sender import send_email
+from utils.mail_sender.outbox import Outbox, OutboxDispatcher
+from utils.mail_sender.digest import DigestCollector
 from utils.mail_sender.email_generator import generate_email
 
-from utils.util import get_undetected_driver
-from utils.automation import (
-    capture_jwt_token, login,
-    navigate_to_class_listings
-)
+from utils.dedupe_store import DoneClassStore
+from utils.snapshot_store import ClassSnapshotStore
+from utils.models import ClassSummary, Student
+from utils.http_client import close_sessions, TokenRejectedError, atlas_limiter, atlas_response_cache
+from utils.token_manager import get_jwt_token, invalidate_token
+from utils import metrics
+from utils.scheduler import run_scheduler, run_job
+from utils.tenants import load_tenants, run_tenants, TENANTS_FILE
+from utils.cassette import cassette, REPLAY_SPEED
+from utils.static import DATA_DIR, DEFAULT_DATA_DIR
 
 
 load_dotenv()
-SCHEDULE_INTERVAL_SECONDS = 12 * 60 * 60
-done_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "utils", "data", "done_classes.txt")
-
-
-def run_every_12_hours():
-    print("Starting scheduled automation (runs every 12 hours)")
-    run_count = 0
-
-    while True:
-        run_count += 1
-        start = time.time()
-
-        print(f"\n{'=' * 50}")
-        print(f"SCHEDULED RUN #{run_count}")
-        print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'=' * 50}")
-
-        try:
-            main()
-        except Exception as e:
-            print(f"Unhandled error in scheduled run #{run_count}: {e}")
-
-        # --- Timing Logic ---
-        elapsed = time.time() - start
-        remaining = SCHEDULE_INTERVAL_SECONDS - elapsed
-
-        if remaining > 0:
-            next_run_timestamp = time.time() + remaining
-            next_run_time = datetime.fromtimestamp(next_run_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-
-            print(f"Run #{run_count} completed in {elapsed:.1f}s")
-            print(f"Next run scheduled for: {next_run_time}")
-
-            # Converted log to show Hours instead of Minutes for clarity
-            print(f"Waiting {remaining / 3600:.2f} hours...")
-
-            time.sleep(remaining)
+ENRICH_BATCH_SIZE = 100
+# "per_class" sends one email per class; "digest" sends one email per instructor/coordinator per run.
+EMAIL_MODE = os.getenv("EMAIL_MODE", "per_class").strip().lower()
+
+
+def notification_key(class_id: str, recipient: str, new_students: list[Student]) -> str:
+    """Idempotency key for one recipient being told about one set of new students in a class."""
+    student_ids = ",".join(sorted(student.id for student in new_students))
+    digest = hashlib.sha1(student_ids.encode("utf-8")).hexdigest()[:16]
+    return f"{class_id}:{recipient.strip().lower()}:{digest}"
+
+
+def process_classes(classes: list[ClassSummary], jwt_token: str, done_classes: DoneClassStore,
+                    snapshots: ClassSnapshotStore, outbox: Outbox, dispatcher: OutboxDispatcher,
+                    digest: DigestCollector = None):
+    """Enrich classes and queue their notifications.
+
+    In per-class mode each class's email is queued immediately. With a ``digest``
+    collector the class is only collected; its snapshot is recorded once the
+    digests are queued at the end of the run.
+    """
+    def known_student_ids(class_id):
+        snapshot = snapshots.get(class_id)
+        return snapshot.student_ids if snapshot else set()
+
+    for result in enrich_classes(classes, jwt_token, known_student_ids):
+        classId = result.class_id
+        instructor_name = result.instructor_name
+        instructor_email = result.instructor_email
+        coordinator_email = result.coordinator_email
+        class_details = result.details
+        student_ids = result.student_ids
+        new_students = result.new_students
+        occupied_seats = result.summary.occupied_seats
+        if not class_details:
+            # Details could not be fetched; leave the snapshot alone so the class is retried.
+            continue
+
+        previous = snapshots.get(classId)
+        if previous is None and classId in done_classes:
+            # Notified before snapshots existed: record a baseline instead of re-sending.
+            print(f"Recording baseline snapshot for already processed class {classId}")
+            snapshots.update(classId, occupied_seats, student_ids)
+            continue
+
+        if new_students and instructor_email and digest is not None:
+            print(f"Collecting class {classId} for {instructor_email}'s digest ({len(new_students)} new students)")
+            digest.add(result)
+            continue
+
+        if new_students and instructor_email:
+            email_html = generate_email(instructor_name, new_students, class_details)
+            print(f"Queueing email to {instructor_email} for class {classId} ({len(new_students)} new students)")
+            for recipient in (instructor_email, os.getenv('NATHAN_EMAIL'), coordinator_email):
+                if recipient:
+                    outbox.enqueue(notification_key(classId, recipient, new_students),
+                                   classId, recipient, instructor_name, email_html)
+            dispatcher.notify()
+        elif not new_students:
+            print(f"No new students in class {classId}")
         else:
-            print(f"Run #{run_count} took {elapsed:.1f}s (>= 12 hours). Starting next run immediately.")
-            
-
-def main():
-    page_number = 0
-    driver = get_undetected_driver(headless=True)
+            # Leave the snapshot alone so these students are reported once an email is known.
+            print(f"No email found for instructor ID {result.summary.instructor_id}; class {classId} will be retried")
+            continue
+        snapshots.update(classId, occupied_seats, student_ids)
+        done_classes.add(classId)
+    done_classes.flush()
+    snapshots.flush()
+
+
+def queue_digests(digest: DigestCollector, done_classes: DoneClassStore, snapshots: ClassSnapshotStore,
+                  outbox: Outbox, dispatcher: OutboxDispatcher):
+    if not len(digest):
+        return
+    queued = digest.enqueue_all(outbox)
+    dispatcher.notify()
+    print(f"Queued {queued} digest emails covering {len(digest)} classes.")
+    for result in digest.notifications:
+        snapshots.update(result.class_id, result.summary.occupied_seats, result.student_ids)
+        done_classes.add(result.class_id)
+    done_classes.flush()
+    snapshots.flush()
+
+
+def run_pipeline(jwt_token: str, done_classes: DoneClassStore, snapshots: ClassSnapshotStore,
+                 outbox: Outbox, dispatcher: OutboxDispatcher, full_scan: bool = False):
+    """List classes and notify about new students.
+
+    Normally only classes whose seat count moved are enriched. ``full_scan``
+    re-checks every class, which also catches a drop and a sign-up that leave
+    the count unchanged.
+    """
+    digest = DigestCollector(copy_to=os.getenv('NATHAN_EMAIL')) if EMAIL_MODE == "digest" else None
+    pending = []
+    for cls in iter_classes(jwt_token):
+        if not full_scan and not snapshots.seats_changed(cls.class_id, cls.occupied_seats):
+            print(f"Skipping unchanged class {cls.class_id}")
+            continue
+        pending.append(cls)
+        if len(pending) >= ENRICH_BATCH_SIZE:
+            process_classes(pending, jwt_token, done_classes, snapshots, outbox, dispatcher, digest)
+            pending = []
+    if pending:
+        process_classes(pending, jwt_token, done_classes, snapshots, outbox, dispatcher, digest)
+    if digest is not None:
+        queue_digests(digest, done_classes, snapshots, outbox, dispatcher)
+    print("All pages processed.")
+
+
+def main(full_scan: bool = True):
+    metrics.reset()
+    done_classes = DoneClassStore()
+    snapshots = ClassSnapshotStore()
+    outbox = Outbox()
+    # Start sending right away: emails left over from earlier runs go out while this run fetches.
+    # A replay only sends (to its sink) what it queues itself.
+    dispatcher = OutboxDispatcher(outbox, created_after=time.time() if cassette.replaying else 0)
+    dispatcher.start()
     try:
-        login(driver)
-        navigate_to_class_listings(driver)
-        jwt_token = capture_jwt_token(driver)
-        if driver:
-            print("JWT token captured successfully.")
-            driver.quit()
-        while True:
-            islast_page, classes = get_classes(page_number, jwt_token)
-            if classes:
-                print(f"Found {len(classes)} classes with enrolled students.")
-                for cls in classes:
-                    classId = str(cls.get("classId")).strip()
-                    try:
-                        with open(done_file_path, "r", encoding='utf-8') as f:
-                            done_classes = [line.strip() for line in f.read().splitlines() if line.strip()]
-                    except FileNotFoundError:
-                        done_classes = []
-                    if classId in done_classes:
-                        print(f"Skipping already processed class {classId}")
-                        continue
-                    instructor_id = cls.get("instructorId")
-                    instructor_name = cls.get("instructorName")
-                    instructor_email, org_type, org_code = get_instructor_email(instructor_id, jwt_token)
-                    class_details, students = get_class_details(classId, jwt_token)
-                    coordinator_email = get_coordinator_email(org_type, org_code, jwt_token)
-                    email_html = generate_email(instructor_name, students, class_details)
-                    if class_details and students and instructor_email:
-                        print(f"Sending email to {instructor_email} for class {classId}")
-                        send_email(instructor_email, instructor_name, email_html)
-                        send_email(os.getenv('NATHAN_EMAIL'), instructor_name, email_html)
-                        if coordinator_email:
-                            send_email(coordinator_email, instructor_name, email_html)
-                    else:
-                        print(f"No email found for instructor ID {instructor_id}")
-                    with open(done_file_path, "a", encoding='utf-8') as f:
-                        f.write(f"{classId}\n")
-            else:
-                print(f"No classes with enrolled students found on page {page_number + 1}.")
-
-            page_number += 1
-            time.sleep(random.randint(1, 3))
-            if islast_page:
-                print("All pages processed.")
-                break
+        jwt_token = get_jwt_token()
+        if not jwt_token:
+            print("Could not obtain a JWT token, skipping this run.")
+            return
+        try:
+            with metrics.span("pipeline"):
+                run_pipeline(jwt_token, done_classes, snapshots, outbox, dispatcher, full_scan)
+        except TokenRejectedError:
+            print("JWT token was rejected, logging in again.")
+            invalidate_token()
+            jwt_token = get_jwt_token(force_login=True)
+            if not jwt_token:
+                print("Could not obtain a JWT token, skipping this run.")
+                return
+            with metrics.span("pipeline"):
+                run_pipeline(jwt_token, done_classes, snapshots, outbox, dispatcher, full_scan)
 
     except Exception as e:
         print(f"An error occurred in main: {e}")
+    finally:
+        with metrics.span("outbox_drain"):
+            dispatcher.stop()
+        pruned = outbox.prune()
+        if pruned:
+            print(f"Pruned {pruned} old outbox rows")
+        outbox.close()
+        done_classes.close()
+        snapshots.close()
+        instructor_cache.save()
+        coordinator_cache.save()
+        print(f"Instructor cache: {instructor_cache.stats()}")
+        print(f"Coordinator cache: {coordinator_cache.stats()}")
+        print(f"Atlas rate limiter: {atlas_limiter.stats()}")
+        print(f"Atlas response cache: {atlas_response_cache.stats()}")
+        atlas_response_cache.prune()
+        close_sessions()
+        try:
+            json_path, prom_path = metrics.export()
+            print(f"Run metrics written to {json_path} and {prom_path}")
+        except OSError as e:
+            print(f"Failed to write run metrics: {e}")
+
+
+def profile_once(output_path: str = None, full_scan: bool = True):
+    """Run ``main()`` once under cProfile and print the hottest functions."""
+    import pstats
+    import cProfile
+
+    output_path = output_path or os.path.join(metrics.METRICS_DIR, f"run_{datetime.now():%Y%m%d_%H%M%S}.prof")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.runcall(main, full_scan)
+    profiler.dump_stats(output_path)
+    print(f"Profile written to {output_path}")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
 
 
 if __name__ == "__main__":
-    run_every_12_hours()
+    parser = argparse.ArgumentParser(description="AHA Atlas enrollment notifications")
+    parser.add_argument("--once", action="store_true", help="run a single full pass instead of the scheduler")
+    parser.add_argument("--poll", action="store_true", help="run a single poll pass (only classes whose seats changed)")
+    parser.add_argument("--tenants", nargs="?", const=TENANTS_FILE, metavar="PATH",
+                        help="run every organisation in the tenants file in parallel worker processes")
+    parser.add_argument("--profile", nargs="?", const="", metavar="PATH",
+                        help="run a single pass under cProfile and save the stats (default: METRICS_DIR)")
+    parser.add_argument("--record", metavar="CASSETTE", help="run a single pass and record all Atlas/Brevo traffic")
+    parser.add_argument("--replay", metavar="CASSETTE",
+                        help="run a single pass offline from a recording; emails go to a local sink")
+    parser.add_argument("--replay-speed", type=float, default=REPLAY_SPEED,
+                        help="1 keeps the recorded latencies, N replays N times faster, 0 without delays")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.record:
+        cassette.start_recording(args.record)
+    elif args.replay:
+        if os.path.abspath(DATA_DIR) == os.path.abspath(DEFAULT_DATA_DIR):
+            # A replay moves snapshots forward and uses up idempotency keys; never let it touch production state.
+            parser.error("--replay needs DATA_DIR set to a scratch directory, not the default data directory")
+        cassette.start_replay(args.replay, speed=args.replay_speed)
+
+    if args.tenants:
+        tenants = load_tenants(args.tenants)
+        if args.once or args.poll:
+            run_job("tenant run", lambda: run_tenants(tenants, full_scan=not args.poll))
+        else:
+            run_scheduler(poll_job=lambda: run_tenants(tenants, full_scan=False),
+                          full_job=lambda: run_tenants(tenants, full_scan=True))
+    elif args.profile is not None:
+        profile_once(args.profile or None, full_scan=not args.poll)
+    elif args.once or args.record or args.replay:
+        run_job("run", lambda: main(full_scan=not args.poll))
+    elif args.poll:
+        run_job("poll", lambda: main(full_scan=False))
+    else:
+        run_scheduler(poll_job=lambda: main(full_scan=False), full_job=main)
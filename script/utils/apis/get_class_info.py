@@ -1,10 +1,23 @@
-import requests
+import os
+from typing import Optional
 from datetime import datetime
 from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
 from ..static import ApiEndpoints
+from ..http_client import atlas_get, atlas_get_cached
+from ..models import ClassDetails, Student
+from .. import metrics
 
 
-def extract_class_details(response: dict) -> dict:
+load_dotenv()
+STUDENT_PAGE_SIZE = int(os.getenv("STUDENT_PAGE_SIZE", "50"))
+
+
+class StudentsFetchError(Exception):
+    """A page of a class's student list could not be fetched."""
+
+
+def extract_class_details(response: dict) -> ClassDetails:
     class_data = response.get("data", {}).get("class", {})
 
     # -------- Address --------
@@ -36,13 +49,9 @@ def extract_class_details(response: dict) -> dict:
         dt = datetime.fromtimestamp(class_start_epoch / 1000, tz=ZoneInfo("America/New_York"))
         class_start_date = dt.strftime("%m-%d-%Y | %I:%M %p").lower()
 
-    return {
-        "date": class_start_date,
-        "location": location
-    }
+    return ClassDetails(date=class_start_date, location=location)
 
-def extract_student_contact_info(response: dict) -> list:
-    results = []
+def extract_student_contact_info(response: dict):
     students = (
         response
         .get("data", {})
@@ -50,56 +59,68 @@ def extract_student_contact_info(response: dict) -> list:
         .get("items", [])
     )
     for student in students:
-        results.append({
-            "name": f'{student.get("firstName", "")} {student.get("lastName", "")}',
-            "email": student.get("emailId", ""),
-            "phone": student.get("phoneNumber", "")
-        })
+        yield Student(
+            id=str(student.get("studentId") or student.get("id") or student.get("emailId", "")),
+            name=f'{student.get("firstName", "")} {student.get("lastName", "")}',
+            email=student.get("emailId", ""),
+            phone=student.get("phoneNumber", "")
+        )
 
-    return results
 
+def is_last_students_page(response: dict, page: int, page_size: int, item_count: int) -> bool:
+    pagination = response.get("data", {}).get("students", {}).get("pagination") or {}
+    if "isLast" in pagination:
+        return bool(pagination["isLast"])
+    if pagination.get("totalPages") is not None:
+        return page >= int(pagination["totalPages"])
+    return item_count < page_size
 
-# validate responses
-def responses_are_valid(class_response, students_response) -> bool:
-    if class_response.status_code != 200:
-        print(f"Failed to get class details: {class_response.status_code}")
-        return False
-    if students_response.status_code != 200:
-        print(f"Failed to get students details: {students_response.status_code}")
+
+def class_info_is_valid(class_info: ClassDetails) -> bool:
+    if not class_info.is_complete:
+        print("Class details extraction returned incomplete data.")
         return False
     return True
 
 
-# validate output data from responses
-def extracted_data_is_valid(class_info: dict, student_info: list) -> bool:
-    if class_info['date'] == "" or class_info['location'] == "":
-        print("Class details extraction returned incomplete data.")
+def student_is_valid(student: Student) -> bool:
+    if not student.is_complete:
+        print(f"Student contact info extraction returned incomplete data.")
         return False
-    for student in student_info:
-        if student['name'] == "" or student['email'] == "":
-            print(f"Student contact info extraction returned incomplete data.")
-            return False
     return True
 
 
-def get_class_details(class_id: str, jwt_token: str):
-    class_url = ApiEndpoints.GET_CLASS_DETAILS(class_id)
-    students_url = ApiEndpoints.GET_CLASS_STUDENTS(class_id)
-    headers = ApiEndpoints.get_headers(jwt_token)
-
-    class_response = requests.get(class_url, headers=headers)
+def get_class_info(class_id: str, jwt_token: str) -> Optional[ClassDetails]:
+    with metrics.span("get_class_info"):
+        # Date and location rarely change once a class is published, so the document is cached on disk.
+        class_response = atlas_get_cached(ApiEndpoints.GET_CLASS_DETAILS(class_id), jwt_token)
     print(f'Request made for fetching class details for class-ID {class_id}')
-    students_response = requests.get(students_url, headers=headers)
-    print(f'Request made for fetching students details for class-ID {class_id}')
-
-    if responses_are_valid(class_response, students_response):
-        class_info = extract_class_details(class_response.json())
-        student_info = extract_student_contact_info(students_response.json())
-
-        if extracted_data_is_valid(class_info, student_info):
-            return class_info, student_info
-        else:
-            return {}, []
-    else:
-        print(f"Failed to get class details for class {class_id}: {students_response.status_code}")
-        return {}, []
+    if class_response.status_code != 200:
+        print(f"Failed to get class details: {class_response.status_code}")
+        return None
+    class_info = extract_class_details(class_response.json())
+    return class_info if class_info_is_valid(class_info) else None
+
+
+def iter_class_students(class_id: str, jwt_token: str, page_size: int = STUDENT_PAGE_SIZE):
+    """Yield every enrolled student of a class, fetching one page at a time.
+
+    Stops after the last page; raises StudentsFetchError if a page fails.
+    """
+    page = 1
+    while True:
+        with metrics.span("get_class_students"):
+            students_response = atlas_get(ApiEndpoints.GET_CLASS_STUDENTS(class_id, page, page_size), jwt_token)
+        print(f'Request made for fetching students page {page} for class-ID {class_id}')
+        if students_response.status_code != 200:
+            raise StudentsFetchError(
+                f"Failed to get students details for class {class_id} page {page}: {students_response.status_code}"
+            )
+        response = students_response.json()
+        item_count = 0
+        for student in extract_student_contact_info(response):
+            item_count += 1
+            yield student
+        if is_last_students_page(response, page, page_size, item_count):
+            return
+        page += 1
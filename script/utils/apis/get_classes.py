@@ -1,10 +1,39 @@
+import os
 import json
-import requests
-from datetime import datetime, date, time
-from ..static import ApiEndpoints
+import math
+import threading
+from datetime import datetime, date, time, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from ..static import ApiEndpoints, ATLAS_PARENT_ID, DATA_DIR
+from ..http_client import atlas_post
+from ..cassette import cassette
+from ..models import ClassSummary
+from .. import metrics
 
 
-def extract_non_empty_classes(response: dict) -> tuple[bool, list[dict]]:
+load_dotenv()
+PAGE_SIZE = 100
+PAGE_PREFETCH_WORKERS = int(os.getenv("PAGE_PREFETCH_WORKERS", "4"))
+# Page size is tuned between listings to keep a page near PAGE_TARGET_SECONDS.
+PAGE_SIZE_MIN = int(os.getenv("CLASS_PAGE_SIZE_MIN", "25"))
+PAGE_SIZE_MAX = int(os.getenv("CLASS_PAGE_SIZE_MAX", "200"))
+PAGE_TARGET_SECONDS = float(os.getenv("CLASS_PAGE_TARGET_SECONDS", "2"))
+# Only list classes starting within this many days (default: through the end of the year).
+CLASS_WINDOW_DAYS = int(os.getenv("CLASS_WINDOW_DAYS")) if os.getenv("CLASS_WINDOW_DAYS") else None
+# Passed as classFilters.seatAvailability when set; empty classes are still dropped client-side.
+CLASS_SEAT_FILTER = os.getenv("CLASS_SEAT_FILTER") or None
+
+
+def is_listable(item: dict, query: "ClassQuery" = None) -> bool:
+    """A class is kept when it has occupied seats and (if a query is given) starts inside its window."""
+    # Skip if no occupied seats
+    if item.get("occupiedSeats", 0) == 0:
+        return False
+    return query is None or query.in_window(item)
+
+
+def extract_non_empty_classes(response: dict, query: "ClassQuery" = None) -> tuple[bool, list[ClassSummary]]:
     results = []
 
     data = response.get("data", {})
@@ -14,24 +43,35 @@ def extract_non_empty_classes(response: dict) -> tuple[bool, list[dict]]:
     is_last = pagination.get("isLast", False)
 
     for item in items:
-        occupied_seats = item.get("occupiedSeats", 0)
-
-        # Skip if no occupied seats
-        if occupied_seats == 0:
+        if not is_listable(item, query):
             continue
 
         instructor = item.get("primaryInstructor", {})
 
-        results.append({
-            "classId": item.get("classId"),
-            "instructorId": instructor.get("instructorId", ""),
-            "instructorName": instructor.get("instructorName", "")
-        })
+        results.append(ClassSummary(
+            class_id=str(item.get("classId")).strip(),
+            occupied_seats=item.get("occupiedSeats", 0),
+            instructor_id=str(instructor.get("instructorId") or "").strip(),
+            instructor_name=instructor.get("instructorName", "")
+        ))
 
     return is_last, results
 
 
-def get_today_and_year_end():
+def get_total_pages(response: dict, page_size: int = PAGE_SIZE):
+    pagination = response.get("data", {}).get("pagination", {})
+    total_pages = pagination.get("totalPages")
+    if total_pages is not None:
+        return int(total_pages)
+    for key in ("totalElements", "totalItems", "totalCount", "total"):
+        total = pagination.get(key)
+        if total is not None:
+            return math.ceil(int(total) / page_size)
+    return None
+
+
+def get_date_window(window_days: int = None) -> dict:
+    """Today through ``window_days`` ahead, or through 31 Dec of this year when no window is set."""
     # Local timezone-aware "now"
     now = datetime.now().astimezone()
 
@@ -39,50 +79,256 @@ def get_today_and_year_end():
     today_date = now.date()
     today_start = datetime.combine(today_date, time.min).astimezone()
 
-    # End of ongoing year (start of 31 Dec)
-    year_end_date = date(today_date.year, 12, 31)
-    year_end_start = datetime.combine(year_end_date, time.min).astimezone()
+    # End of the window, or of the ongoing year (start of 31 Dec)
+    if window_days is not None:
+        end_date = today_date + timedelta(days=window_days)
+    else:
+        end_date = date(today_date.year, 12, 31)
+    end_start = datetime.combine(end_date, time.min).astimezone()
 
     return {
         "today_epoch_ms": int(today_start.timestamp() * 1000),
         "today_date": today_date.strftime("%Y-%m-%d"),
-        "year_end_epoch_ms": int(year_end_start.timestamp() * 1000),
-        "year_end_date": year_end_date.strftime("%Y-%m-%d"),
+        "year_end_epoch_ms": int(end_start.timestamp() * 1000),
+        "year_end_date": end_date.strftime("%Y-%m-%d"),
     }
 
 
-def get_classes(page_number: int, jwt_token: str):
-    date_info = get_today_and_year_end()
-    url = ApiEndpoints.GET_CLASSES(page_number)
-    headers = ApiEndpoints.get_headers(jwt_token)
-
-    payload = json.dumps({"classFilters":
-      {"isFirstTsSelected": True,
-       "courseId": None,
-       "disciplineCodes": None,
-       "seatAvailability": None,
-       "langCode": None,
-       "location": None,
-       "classStatus": None,
-       "isPrivate": None,
-       "applyFilter": None,
-       "applyTsFilter": None,
-       "page": page_number,
-       "pageNumber": page_number,
-       "parentId": 18260,
-       "size": 100,
-       "instructorIds": [],
-       "classStartDate": date_info.get("today_epoch_ms"),
-       "classEndDate": date_info.get("year_end_epoch_ms"),
-       "fromDate": date_info.get("today_date"),
-       "toDate": date_info.get("year_end_date"),
-       "selectedSort": "startDateTime",
-       "sortOrder": "desc"
-}})
-
-    response = requests.post(url, headers=headers, data=payload)
-    if response.status_code == 200:
-        return extract_non_empty_classes(response.json())
-    else:
+class ClassQuery:
+    """Builds the getClasses request: URL plus the ``classFilters`` payload.
+
+    The date window and page size are fixed when the query is built, so every
+    page of one listing uses the same offsets and bounds.
+    """
+
+    def __init__(self, parent_id: int = None, page_size: int = PAGE_SIZE, window_days: int = CLASS_WINDOW_DAYS,
+                 seat_availability: str = CLASS_SEAT_FILTER):
+        self.parent_id = int(parent_id if parent_id is not None else ATLAS_PARENT_ID)
+        self.page_size = page_size
+        self.window_days = window_days
+        self.seat_availability = seat_availability
+        self.window = get_date_window(window_days)
+
+    def url(self, page_number: int) -> str:
+        return ApiEndpoints.GET_CLASSES(page_number, self.page_size)
+
+    def payload(self, page_number: int) -> str:
+        return json.dumps({"classFilters": {
+            "isFirstTsSelected": True,
+            "courseId": None,
+            "disciplineCodes": None,
+            "seatAvailability": self.seat_availability,
+            "langCode": None,
+            "location": None,
+            "classStatus": None,
+            "isPrivate": None,
+            "applyFilter": None,
+            "applyTsFilter": None,
+            "page": page_number,
+            "pageNumber": page_number,
+            "parentId": self.parent_id,
+            "size": self.page_size,
+            "instructorIds": [],
+            "classStartDate": self.window["today_epoch_ms"],
+            "classEndDate": self.window["year_end_epoch_ms"],
+            "fromDate": self.window["today_date"],
+            "toDate": self.window["year_end_date"],
+            "selectedSort": "startDateTime",
+            "sortOrder": "desc"
+        }})
+
+    def in_window(self, item: dict) -> bool:
+        """Client-side check of the date window, for when the gateway ignores it."""
+        start = item.get("startDateTime")
+        if not isinstance(start, (int, float)):
+            return True
+        return self.window["today_epoch_ms"] <= start < self.window["year_end_epoch_ms"] + 86_400_000
+
+
+class ListingStats:
+    """Bytes and items downloaded for one class listing, and how many were thrown away."""
+
+    def __init__(self):
+        self.pages = 0
+        self.bytes = 0
+        self.items = 0
+        self.kept = 0
+        self.bytes_discarded = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, page_bytes: int, items: int, kept: int):
+        with self._lock:
+            self.pages += 1
+            self.bytes += page_bytes
+            self.items += items
+            self.kept += kept
+            if items:
+                # Attribute the page's bytes evenly to its items.
+                self.bytes_discarded += page_bytes * (items - kept) / items
+        metrics.increment("class_listing_bytes_total", page_bytes)
+        metrics.increment("class_listing_items_total", kept, result="kept")
+        metrics.increment("class_listing_items_total", items - kept, result="discarded")
+
+    def summary(self) -> str:
+        return (f"Class listing: {self.pages} page(s), {self.bytes / 1024:.1f} KB, "
+                f"{self.items - self.kept} of {self.items} classes discarded "
+                f"(~{self.bytes_discarded / 1024:.1f} KB)")
+
+
+class PageSizeTuner:
+    """Picks the getClasses page size for the next listing from the latency of the last one.
+
+    Pages answered well under ``target_seconds`` grow the size (fewer round
+    trips); slow pages shrink it. The size moves at most 2x per listing and is
+    persisted so separate runs keep learning.
+    """
+
+    def __init__(self, path: str, initial: int = PAGE_SIZE, min_size: int = PAGE_SIZE_MIN,
+                 max_size: int = PAGE_SIZE_MAX, target_seconds: float = PAGE_TARGET_SECONDS):
+        self.path = path
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.size = initial
+        self._latencies = []
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding='utf-8') as f:
+                stored = json.load(f)
+            self.max_size = min(self.max_size, int(stored.get("max_size", self.max_size)))
+            self.size = int(stored["size"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            pass
+        self.size = max(self.min_size, min(self.max_size, self.size))
+
+    def reject(self, size: int):
+        """The gateway refused ``size``; never ask for that much again."""
+        with self._lock:
+            self.max_size = max(self.min_size, min(self.max_size, size // 2))
+            self.size = min(self.size, PAGE_SIZE, self.max_size)
+        self.save()
+
+    def observe(self, seconds: float, requested: int, returned: int, is_last: bool):
+        with self._lock:
+            self._latencies.append(seconds)
+            if not is_last and 0 < returned < requested:
+                # The gateway capped the page; asking for more only wastes the setting.
+                self.max_size = max(self.min_size, returned)
+
+    def finish_listing(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            self._latencies = []
+            if not latencies:
+                return
+            median = latencies[len(latencies) // 2]
+            if median < self.target_seconds / 2:
+                size = self.size * 2
+            elif median > self.target_seconds:
+                size = self.size * self.target_seconds / median
+            else:
+                size = self.size
+            size = int(max(self.size / 2, min(self.size * 2, size)))
+            self.size = max(self.min_size, min(self.max_size, size))
+        self.save()
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding='utf-8') as f:
+                json.dump({"size": self.size, "max_size": self.max_size}, f)
+        except OSError as e:
+            print(f"Failed to save page size: {e}")
+
+
+page_size_tuner = PageSizeTuner(os.path.join(DATA_DIR, 'page_size.json'))
+
+
+def fetch_classes_page(page_number: int, jwt_token: str, query: ClassQuery = None, stats: ListingStats = None):
+    query = query or ClassQuery()
+    with metrics.span("get_classes"):
+        response = atlas_post(query.url(page_number), jwt_token, data=query.payload(page_number))
+    if response.status_code != 200:
         print(f"Failed to get classes on page {page_number}: {response.status_code}")
-        return None, []
+        if response.status_code == 400 and query.page_size > PAGE_SIZE:
+            page_size_tuner.reject(query.page_size)
+        return None
+    data = response.json()
+    if stats is not None:
+        page = data.get("data", {})
+        items = page.get("items", [])
+        # ``elapsed`` is time to the response headers, so rate-limiter waits do not count as latency.
+        page_size_tuner.observe(response.elapsed.total_seconds(), query.page_size, len(items),
+                                bool(page.get("pagination", {}).get("isLast")))
+        stats.record(len(response.content), len(items), sum(1 for item in items if is_listable(item, query)))
+    return data
+
+
+def iter_classes(jwt_token: str, max_workers: int = PAGE_PREFETCH_WORKERS, window_days: int = CLASS_WINDOW_DAYS):
+    """Yield non-empty classes from every page.
+
+    The first page tells us the page count; the remaining pages are then
+    fetched concurrently (paced by the shared Atlas rate limiter) and yielded
+    in page order.
+    Falls back to walking ``isLast`` when the total is not reported.
+    """
+    if cassette.replaying and cassette.listing_page_size:
+        # List exactly as the recorded run did; a tuned size would miss every recorded page.
+        page_size = cassette.listing_page_size
+    else:
+        page_size = page_size_tuner.size
+    query = ClassQuery(page_size=page_size, window_days=window_days)
+    stats = ListingStats()
+    try:
+        yield from _iter_pages(query, stats, jwt_token, max_workers)
+    finally:
+        if not cassette.replaying:
+            page_size_tuner.finish_listing()
+        print(stats.summary())
+        print(f"Next class listing page size: {page_size_tuner.size}")
+
+
+def _iter_pages(query: ClassQuery, stats: ListingStats, jwt_token: str, max_workers: int):
+    first = fetch_classes_page(0, jwt_token, query, stats)
+    if first is None and query.page_size > PAGE_SIZE:
+        print(f"Retrying the class listing with the default page size {PAGE_SIZE}.")
+        query = ClassQuery(page_size=PAGE_SIZE, window_days=query.window_days,
+                           seat_availability=query.seat_availability)
+        first = fetch_classes_page(0, jwt_token, query, stats)
+    if first is None:
+        return
+    is_last, classes = extract_non_empty_classes(first, query)
+    print(f"Found {len(classes)} classes with enrolled students on page 1.")
+    yield from classes
+    if is_last:
+        return
+
+    total_pages = get_total_pages(first, query.page_size)
+    if total_pages is None:
+        page_number = 1
+        while True:
+            response = fetch_classes_page(page_number, jwt_token, query, stats)
+            if response is None:
+                return
+            is_last, classes = extract_non_empty_classes(response, query)
+            print(f"Found {len(classes)} classes with enrolled students on page {page_number + 1}.")
+            yield from classes
+            if is_last:
+                return
+            page_number += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pages") as pool:
+        futures = [
+            pool.submit(fetch_classes_page, page_number, jwt_token, query, stats)
+            for page_number in range(1, total_pages)
+        ]
+        for page_number, future in enumerate(futures, start=1):
+            response = future.result()
+            if response is None:
+                continue
+            _, classes = extract_non_empty_classes(response, query)
+            print(f"Found {len(classes)} classes with enrolled students on page {page_number + 1}.")
+            yield from classes
@@ -1,5 +1,23 @@
-import requests
-from ..static import ApiEndpoints
+import os
+from dotenv import load_dotenv
+from ..static import ApiEndpoints, DATA_DIR
+from ..http_client import atlas_get
+from ..cache import TTLCache
+from .. import metrics
+
+
+load_dotenv()
+coordinator_cache = TTLCache(
+    os.path.join(DATA_DIR, 'coordinator_cache.json'),
+    ttl=float(os.getenv("COORDINATOR_CACHE_TTL_HOURS", "168")) * 3600,
+    negative_ttl=float(os.getenv("COORDINATOR_CACHE_NEGATIVE_TTL_MINUTES", "30")) * 60,
+    max_entries=1000,
+    name="coordinator"
+)
+
+
+class CoordinatorLookupError(Exception):
+    """The coordinator lookup failed, as opposed to the organisation having no coordinator."""
 
 
 def get_coordinator_email_from_response(response_data):
@@ -31,11 +49,35 @@ def get_coordinator_email_from_response(response_data):
 
 def get_coordinator_email(coordinator_id: str, coordinator_type: str, jwt_token: str):
     url = ApiEndpoints.GET_COORDINATOR_INFO(coordinator_id, coordinator_type)
-    headers = ApiEndpoints.get_headers(jwt_token)
 
-    response = requests.get(url, headers=headers)
+    with metrics.span("get_coordinator_email"):
+        response = atlas_get(url, jwt_token)
     print(f'Request made for fetching coordinator info for coordinator-ID {coordinator_id}')
     if response.status_code != 200:
-        print(f"Failed to get coordinator info: {response.status_code}")
-        return None
+        # Raised, not returned as None, so a transient failure is not cached as "no coordinator".
+        raise CoordinatorLookupError(f"Failed to get coordinator info: {response.status_code}")
     return get_coordinator_email_from_response(response.json())
+
+
+def coordinator_cache_key(org_code: str, org_type: str) -> str:
+    return f"{org_code}|{org_type}"
+
+
+def get_coordinator_email_cached(org_code: str, org_type: str, jwt_token: str):
+    """``get_coordinator_email`` memoized per (orgCode, orgType), sharing in-flight requests.
+
+    Only "no coordinator in the response" is cached negatively; failed requests
+    raise, so the class is retried on the next run.
+    """
+    return coordinator_cache.get_or_load(
+        coordinator_cache_key(org_code, org_type),
+        lambda: get_coordinator_email(org_code, org_type, jwt_token)
+    )
+
+
+def invalidate_coordinator(org_code: str = None, org_type: str = None):
+    """Forget one organisation's coordinator, or all of them when called without arguments."""
+    if org_code is None and org_type is None:
+        coordinator_cache.invalidate()
+    else:
+        coordinator_cache.invalidate(coordinator_cache_key(org_code, org_type))
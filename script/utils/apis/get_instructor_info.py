@@ -1,29 +1,74 @@
-import requests
-from ..static import ApiEndpoints
+import os
+from typing import Optional
+from dotenv import load_dotenv
+from ..static import ApiEndpoints, DATA_DIR
+from ..http_client import atlas_get
+from ..cache import TTLCache
+from ..models import Contact
+from .. import metrics
+from ..instructor_directory import instructor_directory
 
 
-def extract_email_from_response(response_data):
+load_dotenv()
+instructor_cache = TTLCache(
+    os.path.join(DATA_DIR, 'instructor_cache.json'),
+    ttl=float(os.getenv("INSTRUCTOR_CACHE_TTL_HOURS", "168")) * 3600,
+    negative_ttl=float(os.getenv("INSTRUCTOR_CACHE_NEGATIVE_TTL_MINUTES", "30")) * 60,
+    max_entries=int(os.getenv("INSTRUCTOR_CACHE_MAX_ENTRIES", "5000")),
+    name="instructor"
+)
+
+
+class InstructorLookupError(Exception):
+    """The instructor lookup failed, as opposed to finding no email."""
+
+
+def extract_email_from_response(response_data) -> Optional[Contact]:
     try:
         items = response_data.get("data", {}).get("items", [])
         for item in items:
             email = item.get("email")
-            org_type = item.get("orgType")
-            org_code = item.get("orgCode")
             if email:
-                return email, org_type, org_code
+                return Contact(email=email, org_type=item.get("orgType"), org_code=item.get("orgCode"))
         return None
 
     except AttributeError:
         return None
 
 
-def get_instructor_email(instructor_id: str, jwt_token: str):
+def get_instructor_email(instructor_id: str, jwt_token: str) -> Optional[Contact]:
     url = ApiEndpoints.GET_INSTRUCTOR_INFO(instructor_id)
-    headers = ApiEndpoints.get_headers(jwt_token)
 
-    response = requests.get(url, headers=headers)
+    with metrics.span("get_instructor_email"):
+        response = atlas_get(url, jwt_token)
     print(f'Request made for fetching instructor email for instructor-ID {instructor_id}')
-    if response.status_code != 200:
-        print(f"Failed to get instructor email: {response.status_code}")
+    if response.status_code == 404:
+        print(f"Instructor-ID {instructor_id} not found")
         return None
+    if response.status_code != 200:
+        # Raised, not returned as None, so a transient failure is not cached as "no email".
+        raise InstructorLookupError(f"Failed to get instructor email: {response.status_code}")
     return extract_email_from_response(response.json())
+
+
+def get_instructor_email_cached(instructor_id: str, jwt_token: str) -> Optional[Contact]:
+    """``get_instructor_email`` backed by ``instructor_cache``; misses are cached negatively.
+
+    Failed requests raise and are not cached, so the class is retried on the next run.
+
+    When the API has no email, instructorList.csv is used as a fallback; such
+    contacts carry no org type/code, so no coordinator can be resolved for them.
+    """
+    def load():
+        contact = get_instructor_email(instructor_id, jwt_token)
+        # Persisted as [email, org_type, org_code] so the JSON cache stays plain data.
+        return [contact.email, contact.org_type, contact.org_code] if contact is not None else None
+
+    value = instructor_cache.get_or_load(instructor_id, load)
+    if value is not None:
+        return Contact(*value)
+    email = instructor_directory.get_email(instructor_id)
+    if email:
+        print(f"Using instructorList.csv email for instructor-ID {instructor_id}")
+        return Contact(email=email)
+    return None
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from . import metrics
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry, persisted as JSON.
+
+    A stored value of ``None`` is a negative entry: the lookup was made and
+    found nothing (or failed), and should not be retried until it expires.
+    """
+
+    def __init__(self, path: str, ttl: float, negative_ttl: float, max_entries: int = 10_000,
+                 name: str = "cache"):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding='utf-8') as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for key, (value, expires_at) in stored.items():
+            if expires_at > now:
+                self._entries[key] = (value, expires_at)
+
+    def get(self, key) -> tuple[bool, object]:
+        """Return ``(found, value)``; ``found`` is False on a miss or expired entry."""
+        key = str(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                hit = False
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                hit = True
+        metrics.increment("cache_lookups_total", cache=self.name, result="hit" if hit else "miss")
+        return (True, entry[0]) if hit else (False, None)
+
+    def set(self, key, value, ttl: float = None):
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            self._entries[str(key)] = (value, time.time() + ttl)
+            self._entries.move_to_end(str(key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for ``key`` or compute it with ``loader()``.
+
+        Concurrent callers asking for the same missing key share one ``loader``
+        call. A loader exception is re-raised to every waiter and not cached;
+        loaders signal "nothing found" by returning None.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+
+        key = str(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.time():
+                return entry[0]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(key), None)
+
+    def save(self):
+        with self._lock:
+            now = time.time()
+            stored = {key: entry for key, entry in self._entries.items() if entry[1] > now}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, self.path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
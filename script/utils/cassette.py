@@ -0,0 +1,181 @@
+import os
+import json
+import gzip
+import time
+import hashlib
+import threading
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs
+from collections import deque
+
+import requests
+from dotenv import load_dotenv
+from .static import DATA_DIR
+from . import metrics
+
+
+load_dotenv()
+CASSETTE_DIR = os.path.join(DATA_DIR, 'cassettes')
+# 1 replays with the recorded latencies, 10 ten times faster, 0 without any delay.
+REPLAY_SPEED = float(os.getenv("REPLAY_SPEED", "1"))
+# Response headers worth keeping; request headers (JWT, API key) are never written.
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+# Request-body fields that change from day to day without changing which response is wanted.
+VOLATILE_BODY_KEYS = {"classStartDate", "classEndDate", "fromDate", "toDate"}
+# Stands in for the JWT while replaying; never sent anywhere (exp is year 2100).
+REPLAY_TOKEN = "replay.eyJleHAiOjQxMDI0NDQ4MDB9.replay"
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_BODY_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def request_body(kwargs: dict):
+    if kwargs.get("json") is not None:
+        return json.dumps(kwargs["json"], sort_keys=True)
+    data = kwargs.get("data")
+    if isinstance(data, bytes):
+        return data.decode("utf-8", errors="replace")
+    return data
+
+
+def request_key(method: str, url: str, body) -> str:
+    """Identify a request by method, URL and body, ignoring the date window in getClasses payloads."""
+    if body:
+        try:
+            body = json.dumps(_strip_volatile(json.loads(body)), sort_keys=True)
+        except ValueError:
+            pass
+    return hashlib.sha1(f"{method.upper()} {url}\n{body or ''}".encode("utf-8")).hexdigest()
+
+
+def build_response(url: str, status: int, headers: dict, body: str, elapsed: float = 0.0) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers.update(headers or {})
+    response._content = (body or "").encode("utf-8")
+    response.elapsed = timedelta(seconds=elapsed)
+    return response
+
+
+class Cassette:
+    """Records Atlas/Brevo traffic to a gzipped JSON-lines file, or replays it.
+
+    While replaying, Atlas requests are answered from the recording (repeated
+    requests get the recorded responses in order, then the last one again)
+    and Brevo sends are written to a local sink instead of being delivered.
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.path = None
+        self.speed = REPLAY_SPEED
+        self.sink_path = None
+        # getClasses page size of the recorded run; replays list with it so the page URLs match.
+        self.listing_page_size = None
+        self._file = None
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def paced(self) -> bool:
+        """Whether Atlas calls should go through the rate limiter: not when replaying at compressed speed."""
+        return not self.replaying or self.speed == 1
+
+    def start_recording(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # The recording holds production data (student contacts), so keep it owner-only.
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600))
+        self._file = gzip.open(path, "wt", encoding='utf-8')
+        self.path = path
+        self.mode = "record"
+        print(f"Recording Atlas/Brevo traffic to {path}")
+
+    def start_replay(self, path: str, speed: float = REPLAY_SPEED, sink_path: str = None):
+        responses = {}
+        listing_page_size = None
+        with gzip.open(path, "rt", encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                responses.setdefault(entry["key"], deque()).append(entry)
+                url = urlparse(entry["url"])
+                if listing_page_size is None and url.path.endswith("/getClasses"):
+                    listing_page_size = int(parse_qs(url.query).get("size", ["0"])[0]) or None
+        self._responses = responses
+        self.listing_page_size = listing_page_size
+        self.path = path
+        self.speed = speed
+        self.sink_path = sink_path or os.path.join(CASSETTE_DIR, 'brevo_sink.jsonl')
+        self.mode = "replay"
+        print(f"Replaying {sum(len(q) for q in responses.values())} recorded responses from {path} "
+              f"(speed {speed or 'instant'}); emails go to {self.sink_path}")
+
+    def record(self, host: str, method: str, url: str, kwargs: dict, response: requests.Response):
+        entry = {
+            "key": request_key(method, url, request_body(kwargs)),
+            "host": host,
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body": response.content.decode("utf-8", errors="replace"),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        line = json.dumps(entry)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + "\n")
+        metrics.increment("cassette_requests_total", mode="record", host=host)
+
+    def replay(self, host: str, method: str, url: str, kwargs: dict) -> requests.Response:
+        key = request_key(method, url, request_body(kwargs))
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                entry = queue.popleft() if len(queue) > 1 else queue[0]
+            else:
+                entry = None
+        if entry is None:
+            print(f"No recorded response for {method.upper()} {url}")
+            metrics.increment("cassette_requests_total", mode="replay", host=host, result="missing")
+            return build_response(url, 404, {"Content-Type": "application/json"},
+                                  json.dumps({"error": "not in cassette"}))
+        if self.speed > 0:
+            time.sleep(entry["elapsed"] / self.speed)
+        metrics.increment("cassette_requests_total", mode="replay", host=host, result="hit")
+        return build_response(url, entry["status"], entry["headers"], entry["body"], entry["elapsed"])
+
+    def sink(self, url: str, kwargs: dict) -> requests.Response:
+        """Accept a Brevo send locally: append the payload to the sink file and answer like Brevo."""
+        payload = kwargs.get("json") or json.loads(request_body(kwargs) or "{}")
+        versions = payload.get("messageVersions") or [payload]
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.sink_path)), exist_ok=True)
+            with open(self.sink_path, "a", encoding='utf-8') as f:
+                f.write(json.dumps(payload) + "\n")
+        metrics.increment("cassette_requests_total", mode="replay", host="brevo", result="sink")
+        message_ids = [f"<replay-{time.time_ns()}-{i}@sink>" for i in range(len(versions))]
+        return build_response(url, 201, {"Content-Type": "application/json"}, json.dumps({"messageIds": message_ids}))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+cassette = Cassette()
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import threading
+from .static import DATA_DIR
+
+
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, 'done_classes.db')
+LEGACY_TEXT_PATH = os.path.join(DATA_DIR, 'done_classes.txt')
+DEFAULT_BATCH_SIZE = 50
+
+
+class DoneClassStore:
+    """SQLite-backed set of processed class IDs.
+
+    All IDs are loaded into memory once, so membership checks are O(1).
+    New IDs are buffered and written in batches inside a single transaction.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, legacy_path: str = LEGACY_TEXT_PATH,
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.legacy_path = legacy_path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS done_classes (class_id TEXT PRIMARY KEY)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.commit()
+
+        self._migrate_legacy_file()
+        self._ids = {row[0] for row in self._conn.execute("SELECT class_id FROM done_classes")}
+
+    def _migrate_legacy_file(self):
+        migrated = self._conn.execute("SELECT value FROM meta WHERE key = 'legacy_migrated'").fetchone()
+        if migrated or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        with open(self.legacy_path, "r", encoding='utf-8') as f:
+            ids = [(line.strip(),) for line in f if line.strip()]
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO done_classes (class_id) VALUES (?)", ids)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_migrated', '1')")
+        print(f"Migrated {len(ids)} class IDs from {self.legacy_path}")
+
+    def __contains__(self, class_id) -> bool:
+        return str(class_id).strip() in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, class_id):
+        class_id = str(class_id).strip()
+        with self._lock:
+            if class_id in self._ids:
+                return
+            self._ids.add(class_id)
+            self._pending.append((class_id,))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO done_classes (class_id) VALUES (?)", self._pending)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+from .http_client import TokenRejectedError
+from .models import ClassSummary, EnrichedClass
+from .apis.get_class_info import get_class_info, iter_class_students, student_is_valid
+from .apis.get_instructor_info import get_instructor_email_cached
+from .apis.get_coordinator_info import get_coordinator_email_cached
+
+
+load_dotenv()
+ENRICH_MAX_WORKERS = int(os.getenv("ENRICH_MAX_WORKERS", "8"))
+
+
+def collect_students(class_id: str, jwt_token: str, known_ids: set):
+    """Stream a class's students, keeping every ID but only the full record of new students.
+
+    Incomplete records are skipped and left out of the IDs, so they are
+    reported once Atlas has their name and email.
+    """
+    student_ids = []
+    new_students = []
+    for student in iter_class_students(class_id, jwt_token):
+        if not student_is_valid(student):
+            print(f"Skipping incomplete student record {student.id} in class {class_id}")
+            continue
+        student_ids.append(student.id)
+        if student.id not in known_ids:
+            new_students.append(student)
+    return student_ids, new_students
+
+
+def enrich_class(cls: ClassSummary, jwt_token: str, lookup_pool: ThreadPoolExecutor, known_ids: set):
+    """Fetch everything needed to notify about one class.
+
+    Class details and the student stream run on ``lookup_pool`` while this thread
+    resolves the instructor and then the coordinator, which depends on the
+    instructor's org. Students already in ``known_ids`` are not kept in memory.
+    """
+    class_id = cls.class_id
+    try:
+        details_future = lookup_pool.submit(get_class_info, class_id, jwt_token)
+        students_future = lookup_pool.submit(collect_students, class_id, jwt_token, known_ids)
+
+        instructor = get_instructor_email_cached(cls.instructor_id, jwt_token)
+        coordinator_email = None
+        if instructor and instructor.org_code:
+            coordinator_email = get_coordinator_email_cached(instructor.org_code, instructor.org_type, jwt_token)
+
+        class_details = details_future.result()
+        student_ids, new_students = students_future.result()
+    except TokenRejectedError:
+        raise
+    except Exception as e:
+        print(f"Failed to enrich class {class_id}: {e}")
+        return None
+
+    return EnrichedClass(
+        summary=cls,
+        details=class_details,
+        instructor=instructor,
+        coordinator_email=coordinator_email,
+        student_ids=student_ids,
+        new_students=new_students
+    )
+
+
+def enrich_classes(classes: list[ClassSummary], jwt_token: str, known_student_ids=None,
+                   max_workers: int = ENRICH_MAX_WORKERS):
+    """Enrich classes concurrently and yield results as they complete.
+
+    ``known_student_ids(class_id)`` returns the IDs already notified for a class.
+    Duplicate class IDs are submitted once. Classes whose enrichment failed
+    are not yielded, so they are retried on the next run.
+    """
+    seen = set()
+    unique_classes = []
+    for cls in classes:
+        if cls.class_id not in seen:
+            seen.add(cls.class_id)
+            unique_classes.append(cls)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lookup") as lookup_pool, \
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrich") as class_pool:
+        futures = [
+            class_pool.submit(
+                enrich_class, cls, jwt_token, lookup_pool,
+                known_student_ids(cls.class_id) if known_student_ids else set()
+            )
+            for cls in unique_classes
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is not None:
+                yield result
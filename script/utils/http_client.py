@@ -0,0 +1,205 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from .static import ATLAS_DEFAULT_HEADERS
+from .rate_limiter import AdaptiveRateLimiter
+from .response_cache import ResponseCache, CachedResponse, token_scope
+from .cassette import cassette
+from . import metrics
+
+
+load_dotenv()
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+ATLAS_MAX_RETRIES = int(os.getenv("ATLAS_MAX_RETRIES", "3"))
+THROTTLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared by every Atlas call so the whole process stays under one adaptive request rate.
+atlas_limiter = AdaptiveRateLimiter(
+    rate=float(os.getenv("ATLAS_RATE_INITIAL", "5")),
+    min_rate=float(os.getenv("ATLAS_RATE_MIN", "0.5")),
+    max_rate=float(os.getenv("ATLAS_RATE_MAX", "20")),
+    increase=float(os.getenv("ATLAS_RATE_STEP", "0.05")),
+    burst=int(os.getenv("ATLAS_RATE_BURST", "4"))
+)
+
+# Stored Atlas GET bodies, revalidated with ETag/Last-Modified when the gateway sends them.
+atlas_response_cache = ResponseCache()
+
+_lock = threading.Lock()
+_atlas_session = None
+_brevo_session = None
+
+
+class TokenRejectedError(Exception):
+    """The Atlas gateway answered 401 for the JWT in use."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _build_session(headers: dict) -> requests.Session:
+    """Session with a keep-alive pool sized for concurrent callers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+def get_atlas_session(jwt_token: str) -> requests.Session:
+    """Shared Atlas gateway session with default headers bound to the JWT."""
+    global _atlas_session
+    with _lock:
+        if _atlas_session is None:
+            _atlas_session = _build_session(ATLAS_DEFAULT_HEADERS)
+        if _atlas_session.headers.get('x-jwt-token') != jwt_token:
+            _atlas_session.headers['x-jwt-token'] = jwt_token
+        return _atlas_session
+
+
+def get_brevo_session() -> requests.Session:
+    """Shared Brevo session with the API key preset."""
+    global _brevo_session
+    with _lock:
+        if _brevo_session is None:
+            _brevo_session = _build_session({
+                "accept": "application/json",
+                "api-key": os.getenv("BREVO_API_KEY"),
+                "content-type": "application/json"
+            })
+        return _brevo_session
+
+
+def _send(session: requests.Session, host: str, method: str, url: str, **kwargs) -> requests.Response:
+    """Send one request, or answer it from the cassette when replaying; records it when recording."""
+    if cassette.replaying:
+        if host == "brevo":
+            return cassette.sink(url, kwargs)
+        return cassette.replay(host, method, url, kwargs)
+    response = session.request(method, url, **kwargs)
+    if cassette.recording:
+        cassette.record(host, method, url, kwargs, response)
+    return response
+
+
+def _atlas_request(method: str, url: str, jwt_token: str, **kwargs) -> requests.Response:
+    """Send an Atlas request through ``atlas_limiter``, retrying throttled (429/5xx) responses."""
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    session = get_atlas_session(jwt_token)
+    attempt = 0
+    while True:
+        if cassette.paced:
+            atlas_limiter.acquire()
+        response = _send(session, "atlas", method, url, **kwargs)
+        metrics.increment("http_requests_total", host="atlas", status=response.status_code)
+        if response.status_code == 401:
+            raise TokenRejectedError(f"Atlas rejected the JWT token for {url}")
+        if response.status_code not in THROTTLE_STATUS_CODES:
+            atlas_limiter.record_success()
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        atlas_limiter.record_throttle(retry_after)
+        attempt += 1
+        if attempt > ATLAS_MAX_RETRIES:
+            return response
+        metrics.increment("http_retries_total", host="atlas")
+        print(f"Atlas answered {response.status_code}, retrying ({attempt}/{ATLAS_MAX_RETRIES}); "
+              f"rate now {atlas_limiter.rate:.2f} req/s")
+        if retry_after is None:
+            time.sleep(min(30.0, 2 ** (attempt - 1)))
+
+
+def atlas_get(url: str, jwt_token: str, **kwargs) -> requests.Response:
+    return _atlas_request("GET", url, jwt_token, **kwargs)
+
+
+def _response_from_cache(url: str, entry: CachedResponse) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.encoding = "utf-8"
+    response._content = entry.body.encode("utf-8")
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+def atlas_get_cached(url: str, jwt_token: str, **kwargs) -> requests.Response:
+    """``atlas_get`` through ``atlas_response_cache``.
+
+    A stored body with validators is revalidated with a conditional request and
+    reused on 304; one without validators is reused until the cache TTL passes.
+    """
+    if cassette.mode:
+        # Recordings need full bodies and replays must not depend on what is cached locally.
+        return atlas_get(url, jwt_token, **kwargs)
+    cache = atlas_response_cache
+    scope = token_scope(jwt_token)
+    entry = cache.load(url, scope)
+    if entry is not None and cache.is_fresh(entry):
+        cache.record("fresh", len(entry.body.encode("utf-8")))
+        return _response_from_cache(url, entry)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if entry is not None:
+        headers.update(entry.conditional_headers())
+    response = atlas_get(url, jwt_token, headers=headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        cache.record("revalidated", len(entry.body.encode("utf-8")))
+        try:
+            cache.touch(url, scope, entry)
+        except OSError as e:
+            print(f"Failed to refresh cached response for {url}: {e}")
+        return _response_from_cache(url, entry)
+
+    cache.record("miss")
+    if response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+        try:
+            cache.store(url, scope, response.content.decode("utf-8"),
+                        response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Failed to cache response for {url}: {e}")
+    return response
+
+
+def atlas_post(url: str, jwt_token: str, **kwargs) -> requests.Response:
+    return _atlas_request("POST", url, jwt_token, **kwargs)
+
+
+def brevo_post(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    response = _send(get_brevo_session(), "brevo", "POST", url, **kwargs)
+    metrics.increment("http_requests_total", host="brevo", status=response.status_code)
+    return response
+
+
+def close_sessions():
+    global _atlas_session, _brevo_session
+    cassette.close()
+    with _lock:
+        for session in (_atlas_session, _brevo_session):
+            if session is not None:
+                session.close()
+        _atlas_session = None
+        _brevo_session = None
@@ -0,0 +1,61 @@
+import os
+import csv
+import threading
+from typing import Optional
+from .static import DATA_DIR
+
+
+INSTRUCTORS_CSV_PATH = os.path.join(DATA_DIR, 'instructorList.csv')
+ID_COLUMN = 5
+EMAIL_COLUMN = 6
+
+
+class InstructorDirectory:
+    """instructorList.csv indexed by instructor ID.
+
+    The file is parsed on first use and again only when its mtime or size
+    changes, so each lookup is a dict access.
+    """
+
+    def __init__(self, path: str = INSTRUCTORS_CSV_PATH):
+        self.path = path
+        self._emails = {}
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+
+        with self._lock:
+            if signature == self._signature:
+                return
+            emails = {}
+            if signature is not None:
+                with open(self.path, mode='r', encoding='utf-8', newline='') as f:
+                    for row in csv.reader(f):
+                        if len(row) > EMAIL_COLUMN:
+                            instructor_id = row[ID_COLUMN].strip()
+                            email = row[EMAIL_COLUMN].strip()
+                            # Keep the first row per ID, matching the old linear scan.
+                            if instructor_id and email and instructor_id not in emails:
+                                emails[instructor_id] = email
+            self._emails = emails
+            self._signature = signature
+
+    def get_email(self, instructor_id) -> Optional[str]:
+        try:
+            self._reload_if_changed()
+        except (OSError, csv.Error, UnicodeDecodeError) as e:
+            print(f"Failed to load instructor list: {e}")
+        return self._emails.get(str(instructor_id).strip())
+
+    def __len__(self) -> int:
+        self._reload_if_changed()
+        return len(self._emails)
+
+
+instructor_directory = InstructorDirectory()
@@ -0,0 +1,61 @@
+import hashlib
+from collections import OrderedDict
+
+from .email_generator import generate_digest_email
+from .outbox import Outbox
+from ..models import EnrichedClass
+
+
+def digest_key(recipient: str, notifications: list[EnrichedClass]) -> str:
+    """Idempotency key for one recipient's digest covering exactly these class deltas."""
+    parts = sorted(
+        f"{n.class_id}:{','.join(sorted(s.id for s in n.new_students))}"
+        for n in notifications
+    )
+    digest = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+    return f"digest:{recipient.strip().lower()}:{digest}"
+
+
+class DigestCollector:
+    """Groups a run's class notifications into one email per instructor and per coordinator.
+
+    Each notification is an ``EnrichedClass`` with new students. The
+    instructor's digest is also copied to ``copy_to`` (Nathan).
+    """
+
+    def __init__(self, copy_to: str = None):
+        self.copy_to = copy_to
+        self.notifications = []
+        self._by_instructor = OrderedDict()
+        self._by_coordinator = OrderedDict()
+
+    def add(self, notification: EnrichedClass):
+        self.notifications.append(notification)
+        self._by_instructor.setdefault(notification.instructor_email, []).append(notification)
+        if notification.coordinator_email:
+            self._by_coordinator.setdefault(notification.coordinator_email, []).append(notification)
+
+    def __len__(self) -> int:
+        return len(self.notifications)
+
+    def enqueue_all(self, outbox: Outbox) -> int:
+        """Render and queue every digest; returns the number of emails queued."""
+        queued = 0
+        for instructor_email, notifications in self._by_instructor.items():
+            instructor_name = notifications[0].instructor_name
+            html = generate_digest_email(f"Instructor {instructor_name}", self._sections(notifications))
+            for recipient in (instructor_email, self.copy_to):
+                if recipient:
+                    queued += outbox.enqueue(digest_key(recipient, notifications), "digest",
+                                             recipient, instructor_name, html)
+
+        for coordinator_email, notifications in self._by_coordinator.items():
+            html = generate_digest_email("Training Center Coordinator", self._sections(notifications))
+            queued += outbox.enqueue(digest_key(coordinator_email, notifications), "digest",
+                                     coordinator_email, "Training Center Coordinator", html)
+        return queued
+
+    @staticmethod
+    def _sections(notifications: list[EnrichedClass]):
+        for n in notifications:
+            yield n.instructor_name, n.details, n.new_students
@@ -1,38 +1,76 @@
 import os
-import requests
 from dotenv import load_dotenv
+from ..static import BREVO_URL
+from ..http_client import brevo_post, parse_retry_after
+from .. import metrics
 
 
 load_dotenv()
-URL = "https://api.brevo.com/v3/smtp/email"
-headers = {
-    "accept": "application/json",
-    "api-key": os.getenv("BREVO_API_KEY"),
-    "content-type": "application/json"
-}
-
-def send_email(receiver_email, receiver_name, html_content):
+SUBJECT = "New Student Enrollment"
+SENDER_NAME = os.getenv("SENDER_NAME", "Code Blue CPR Services")
+# Brevo accepts up to 1000 messageVersions per call; smaller batches keep payloads modest.
+BREVO_BATCH_LIMIT = int(os.getenv("BREVO_BATCH_LIMIT", "100"))
+
+
+def get_sender() -> dict:
+    return {
+        "name": SENDER_NAME,
+        "email": os.getenv("SENDER_EMAIL")
+    }
+
+
+def send_batch(messages: list[dict]) -> list[dict]:
+    """Send several emails in one Brevo call using ``messageVersions``.
+
+    Each message is ``{"email", "name", "html", "tag"}`` and becomes its own
+    version, so recipients never see each other. Returns one delivery result
+    per message: ``{"email", "tag", "sent", "messageId", "error", "statusCode", "retryAfter"}``.
+    """
+    if not messages:
+        return []
     payload = {
-        "sender": {
-            "name": "Code Blue CPR Services",
-            "email": os.getenv("SENDER_EMAIL")
-        },
-        "to": [
+        "sender": get_sender(),
+        "subject": SUBJECT,
+        "htmlContent": messages[0]["html"],
+        "messageVersions": [
             {
-                "email": receiver_email,
-                "name": receiver_name
+                "to": [{"email": message["email"], "name": message["name"]}],
+                "htmlContent": message["html"]
             }
-        ],
-        "subject": f"New Student Enrollment",
-        "htmlContent": html_content
+            for message in messages
+        ]
     }
 
+    error = None
+    status_code = None
+    retry_after = None
+    message_ids = []
     try:
-        response = requests.post(URL, json=payload, headers=headers)
+        with metrics.span("send_email_batch"):
+            response = brevo_post(BREVO_URL, json=payload)
+        status_code = response.status_code
         if response.status_code == 201:
-            print("Email sent successfully!")
+            metrics.increment("emails_sent_total", len(messages))
+            message_ids = response.json().get("messageIds", [])
+            print(f"Batch of {len(messages)} emails sent successfully!")
         else:
-            print(f"Error: {response.status_code}")
-            print(response.text)
+            error = f"{response.status_code}: {response.text}"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            print(f"Error: {error}")
     except Exception as e:
-        print(f"Connection Error: {e}")
+        error = f"Connection Error: {e}"
+        print(error)
+
+    return [
+        {
+            "email": message["email"],
+            "tag": message.get("tag"),
+            "sent": error is None,
+            "messageId": message_ids[index] if index < len(message_ids) else None,
+            "error": error,
+            "statusCode": status_code,
+            "retryAfter": retry_after
+        }
+        for index, message in enumerate(messages)
+    ]
+
@@ -0,0 +1,191 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from dotenv import load_dotenv
+
+from .email_sender import send_batch, BREVO_BATCH_LIMIT
+from ..dedupe_store import DEFAULT_DB_PATH
+from ..rate_limiter import RateLimiter
+from .. import metrics
+
+
+load_dotenv()
+BREVO_RATE_PER_SECOND = float(os.getenv("BREVO_RATE_PER_SECOND", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "2"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "900"))
+# How long the end of a run waits for retries that are due soon before leaving them for the next run.
+OUTBOX_DRAIN_SECONDS = float(os.getenv("OUTBOX_DRAIN_SECONDS", "120"))
+# Sent/failed rows are deleted after this long; by then the class snapshot has long since moved on.
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", "30"))
+
+
+class Outbox:
+    """Durable queue of rendered emails, one row per idempotency key.
+
+    Rows move from ``pending`` to ``sent``, or to ``failed`` after
+    OUTBOX_MAX_ATTEMPTS attempts. Enqueueing an existing key is a no-op,
+    so a notification is never queued twice. The rendered HTML (student
+    contact details) is dropped once a row is sent; the key is kept until
+    ``prune`` removes the row.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "idempotency_key TEXT PRIMARY KEY, class_id TEXT, email TEXT, name TEXT, html TEXT, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt_at REAL NOT NULL, last_error TEXT, message_id TEXT, "
+            "created_at REAL NOT NULL, sent_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at)")
+        self._conn.commit()
+
+    def enqueue(self, idempotency_key: str, class_id, email: str, name: str, html: str) -> bool:
+        """Queue an email; returns False if the key was already queued."""
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, class_id, email, name, html, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (idempotency_key, str(class_id), email, name, html, now, now)
+            )
+        return cursor.rowcount == 1
+
+    def due(self, limit: int, created_after: float = 0) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idempotency_key, class_id, email, name, html, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? AND created_at >= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (time.time(), created_after, limit)
+            ).fetchall()
+        return [
+            {"key": key, "classId": class_id, "email": email, "name": name, "html": html, "attempts": attempts}
+            for key, class_id, email, name, html, attempts in rows
+        ]
+
+    def next_attempt_at(self, created_after: float = 0):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending' AND created_at >= ?",
+                (created_after,)
+            ).fetchone()
+        return row[0]
+
+    def mark_sent(self, key: str, message_id):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, message_id = ?, sent_at = ?, "
+                "last_error = NULL, html = NULL WHERE idempotency_key = ?",
+                (message_id, time.time(), key)
+            )
+
+    def mark_retry(self, key: str, attempts: int, error: str, delay: float):
+        status = 'failed' if attempts >= OUTBOX_MAX_ATTEMPTS else 'pending'
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? "
+                "WHERE idempotency_key = ?",
+                (status, attempts, error, time.time() + delay, key)
+            )
+
+    def prune(self, retention_days: float = OUTBOX_RETENTION_DAYS) -> int:
+        """Delete sent/failed rows older than ``retention_days``; also clears HTML left on older sent rows."""
+        cutoff = time.time() - retention_days * 86400
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE outbox SET html = NULL WHERE status = 'sent' AND html IS NOT NULL")
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status IN ('sent', 'failed') AND COALESCE(sent_at, created_at) < ?",
+                (cutoff,)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def close(self):
+        self._conn.close()
+
+
+def backoff_delay(attempts: int, retry_after=None) -> float:
+    """Exponential backoff with jitter, never shorter than the server's ``Retry-After``."""
+    delay = min(OUTBOX_BACKOFF_MAX_SECONDS, OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+    delay = random.uniform(delay / 2, delay)
+    return max(delay, retry_after or 0)
+
+
+class OutboxDispatcher:
+    """Background thread that drains the outbox in Brevo batches under a rate limit.
+
+    With ``created_after`` only rows queued from that time on are sent; older
+    pending rows are left for a later run.
+    """
+
+    def __init__(self, outbox: Outbox, rate_per_second: float = BREVO_RATE_PER_SECOND,
+                 batch_limit: int = BREVO_BATCH_LIMIT, poll_interval: float = 1.0, created_after: float = 0):
+        self.outbox = outbox
+        self.created_after = created_after
+        self.batch_limit = batch_limit
+        self.poll_interval = poll_interval
+        self.limiter = RateLimiter(rate_per_second)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._drain_deadline = None
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def notify(self):
+        """Wake the dispatcher after new emails were queued."""
+        self._wake.set()
+
+    def stop(self, drain_seconds: float = OUTBOX_DRAIN_SECONDS):
+        """Send everything that is due, wait up to ``drain_seconds`` for pending retries, then stop."""
+        self._drain_deadline = time.time() + drain_seconds
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        print(f"Outbox: {self.outbox.counts()}")
+
+    def _run(self):
+        while True:
+            batch = self.outbox.due(self.batch_limit, self.created_after)
+            if batch:
+                self._send(batch)
+                continue
+
+            if self._stop.is_set():
+                next_attempt = self.outbox.next_attempt_at(self.created_after)
+                if next_attempt is None or next_attempt > self._drain_deadline:
+                    return
+                time.sleep(max(0.0, next_attempt - time.time()))
+                continue
+
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _send(self, batch: list[dict]):
+        self.limiter.acquire()
+        results = send_batch([
+            {"email": row["email"], "name": row["name"], "html": row["html"], "tag": row["key"]}
+            for row in batch
+        ])
+        for row, result in zip(batch, results):
+            if result["sent"]:
+                self.outbox.mark_sent(row["key"], result["messageId"])
+            else:
+                attempts = row["attempts"] + 1
+                delay = backoff_delay(attempts, result["retryAfter"])
+                metrics.increment("email_retries_total")
+                print(f"Email for class {row['classId']} to {row['email']} failed (attempt {attempts}), "
+                      f"retrying in {delay:.1f}s")
+                self.outbox.mark_retry(row["key"], attempts, result["error"], delay)
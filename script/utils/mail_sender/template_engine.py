@@ -0,0 +1,148 @@
+import os
+import re
+from html import escape
+from dotenv import load_dotenv
+from ..models import ClassDetails
+
+
+load_dotenv()
+PLACEHOLDER = re.compile(r"{{(\w+)}}")
+# HTML signature closing every email; each organisation points this at its own.
+EMAIL_SIGNATURE_FILE = os.getenv(
+    "EMAIL_SIGNATURE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'signature.html')
+)
+
+
+class CompiledTemplate:
+    """A template split once into literal chunks and placeholder names.
+
+    Rendering is a single ``"".join`` over the precomputed chunks; values are
+    inserted as given, so callers escape anything that comes from user data.
+    """
+
+    def __init__(self, source: str):
+        self.chunks = PLACEHOLDER.split(source)
+        # Odd indexes of ``chunks`` are placeholder names, even indexes are literal text.
+        self.fields = self.chunks[1::2]
+
+    def render(self, values: dict) -> str:
+        parts = self.chunks[:]
+        parts[1::2] = [values[field] for field in self.fields]
+        return "".join(parts)
+
+
+STUDENT_ROW = CompiledTemplate("""
+        <tr>
+            <td style="padding: 8px; border-bottom: 1px solid #ddd;">{{name}}</td>
+            <td style="padding: 8px; border-bottom: 1px solid #ddd;"><a href="mailto:{{email}}">{{email}}</a></td>
+            <td style="padding: 8px; border-bottom: 1px solid #ddd;"><a href="tel:{{phone}}">{{phone}}</a></td>
+        </tr>
+        """)
+
+EMAIL_HEADER = """
+    <html>
+    <body style="font-family: Arial, sans-serif; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto;">
+    
+"""
+
+
+def load_signature(path: str = EMAIL_SIGNATURE_FILE) -> str:
+    with open(path, "r", encoding='utf-8') as f:
+        signature = f.read()
+    if PLACEHOLDER.search(signature):
+        raise ValueError(f"Email signature {path} must not contain {{{{placeholders}}}}")
+    return signature
+
+
+# Signature and closing tags shared by every email.
+EMAIL_FOOTER = """            <br><br>
+            <hr style="border: 0; border-top: 1px solid #eee;">
+    
+""" + load_signature() + """        </div>
+    </body>
+    </html>
+    """
+
+STUDENT_TABLE = """            <table style="width: 100%; border-collapse: collapse; text-align: left;">
+                <thead>
+                    <tr style="background-color: #eee;">
+                        <th style="padding: 8px;">Name</th>
+                        <th style="padding: 8px;">Email</th>
+                        <th style="padding: 8px;">Phone</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {{student_rows}}
+                </tbody>
+            </table>
+    
+"""
+
+ENROLLMENT_EMAIL = CompiledTemplate(EMAIL_HEADER + """            <h2 style="color: #2c3e50;">New Student Enrollment</h2>
+    
+            <p><strong>Instructor {{instructor_name}},</strong></p>
+    
+            <p>A new student has signed up for your class on <strong>{{date}}</strong> at <strong>{{location}}</strong>.</p>
+    
+            <p style="background-color: #f9f9f9; padding: 15px; border-left: 4px solid #007bff;">
+                It is required that you make contact with your student(s) as soon as possible to confirm attendance and provide preliminary details.
+            </p>
+    
+            <h3>Student Contact Information</h3>
+""" + STUDENT_TABLE + EMAIL_FOOTER)
+
+DIGEST_SECTION = CompiledTemplate("""
+            <h3 style="color: #2c3e50;">Class on {{date}}</h3>
+            <p>Instructor: <strong>{{instructor_name}}</strong><br>Location: <strong>{{location}}</strong></p>
+""" + STUDENT_TABLE)
+
+DIGEST_EMAIL = CompiledTemplate(EMAIL_HEADER + """            <h2 style="color: #2c3e50;">New Student Enrollments</h2>
+    
+            <p><strong>{{greeting_name}},</strong></p>
+    
+            <p>New students have signed up in {{class_count}} class(es). Details for each class are below.</p>
+    
+            <p style="background-color: #f9f9f9; padding: 15px; border-left: 4px solid #007bff;">
+                It is required that you make contact with your student(s) as soon as possible to confirm attendance and provide preliminary details.
+            </p>
+    {{sections}}""" + EMAIL_FOOTER)
+
+
+def render_student_rows(students):
+    """Yield one escaped table row per student; consumes ``students`` lazily."""
+    for student in students:
+        yield STUDENT_ROW.render({
+            "name": escape(student.name),
+            "email": escape(student.email),
+            "phone": escape(student.phone or ""),
+        })
+
+
+def render_enrollment_email(instructor_name: str, students, class_info: ClassDetails) -> str:
+    return ENROLLMENT_EMAIL.render({
+        "instructor_name": escape(instructor_name or ""),
+        "date": escape(class_info.date),
+        "location": escape(class_info.location),
+        "student_rows": "".join(render_student_rows(students)),
+    })
+
+
+def render_digest_email(greeting_name: str, sections) -> str:
+    """Render one email covering several classes.
+
+    ``sections`` yields ``(instructor_name, class_info, students)`` per class.
+    """
+    rendered = []
+    for instructor_name, class_info, students in sections:
+        rendered.append(DIGEST_SECTION.render({
+            "instructor_name": escape(instructor_name or ""),
+            "date": escape(class_info.date),
+            "location": escape(class_info.location),
+            "student_rows": "".join(render_student_rows(students)),
+        }))
+    return DIGEST_EMAIL.render({
+        "greeting_name": escape(greeting_name or ""),
+        "class_count": str(len(rendered)),
+        "sections": "".join(rendered),
+    })
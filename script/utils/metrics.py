@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from .static import DATA_DIR
+
+
+load_dotenv()
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(DATA_DIR, 'metrics'))
+PROMETHEUS_PREFIX = "aha_automation"
+
+_lock = threading.Lock()
+_started_at = time.time()
+_stages = {}
+_counters = {}
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def reset():
+    """Start a fresh run: drop every recorded span and counter."""
+    global _started_at
+    with _lock:
+        _started_at = time.time()
+        _stages.clear()
+        _counters.clear()
+
+
+def observe(stage: str, seconds: float):
+    with _lock:
+        stats = _stages.setdefault(stage, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Time the wrapped block as one occurrence of ``stage``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def increment(name: str, value: float = 1, **labels):
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def report() -> dict:
+    with _lock:
+        return {
+            "started_at": datetime.fromtimestamp(_started_at, tz=timezone.utc).isoformat(),
+            "duration_seconds": round(time.time() - _started_at, 3),
+            "stages": {
+                stage: {
+                    "count": stats["count"],
+                    "total_seconds": round(stats["total"], 4),
+                    "mean_seconds": round(stats["total"] / stats["count"], 4),
+                    "max_seconds": round(stats["max"], 4),
+                }
+                for stage, stats in sorted(_stages.items())
+            },
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(_counters.items())
+            ],
+        }
+
+
+def to_prometheus() -> str:
+    """Render the current run in the Prometheus text exposition format."""
+    data = report()
+    lines = [
+        f"# TYPE {PROMETHEUS_PREFIX}_run_duration_seconds gauge",
+        f"{PROMETHEUS_PREFIX}_run_duration_seconds {data['duration_seconds']}",
+        f"# TYPE {PROMETHEUS_PREFIX}_stage_duration_seconds summary",
+    ]
+    for stage, stats in data["stages"].items():
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+    declared = set()
+    for counter in data["counters"]:
+        metric = f"{PROMETHEUS_PREFIX}_{counter['name']}"
+        if metric not in declared:
+            lines.append(f"# TYPE {metric} counter")
+            declared.add(metric)
+        labels = ",".join(f'{key}="{value}"' for key, value in counter["labels"].items())
+        lines.append(f"{metric}{{{labels}}} {counter['value']}" if labels else f"{metric} {counter['value']}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def export(metrics_dir: str = METRICS_DIR) -> tuple[str, str]:
+    """Write ``run_report.json`` and the ``aha_automation.prom`` textfile; returns both paths."""
+    json_path = os.path.join(metrics_dir, "run_report.json")
+    prom_path = os.path.join(metrics_dir, f"{PROMETHEUS_PREFIX}.prom")
+    _write_atomic(json_path, json.dumps(report(), indent=2))
+    _write_atomic(prom_path, to_prometheus())
+    return json_path, prom_path
@@ -0,0 +1,67 @@
+from typing import Optional
+from dataclasses import dataclass
+
+
+# Slotted, frozen records: no per-instance __dict__, and one allocation per record.
+
+@dataclass(frozen=True, slots=True)
+class ClassSummary:
+    """One row of the getClasses listing."""
+    class_id: str
+    occupied_seats: int
+    instructor_id: str
+    instructor_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class ClassDetails:
+    """Formatted start date and location of a class, as shown in emails."""
+    date: str
+    location: str
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.date and self.location)
+
+
+@dataclass(frozen=True, slots=True)
+class Student:
+    id: str
+    name: str
+    email: str
+    phone: str
+
+    @property
+    def is_complete(self) -> bool:
+        return bool(self.name and self.email)
+
+
+@dataclass(frozen=True, slots=True)
+class Contact:
+    """An instructor's email and, when Atlas knows it, the organisation they are aligned to."""
+    email: str
+    org_type: Optional[str] = None
+    org_code: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class EnrichedClass:
+    """Everything needed to notify about one class."""
+    summary: ClassSummary
+    details: Optional[ClassDetails]
+    instructor: Optional[Contact]
+    coordinator_email: Optional[str]
+    student_ids: list[str]
+    new_students: list[Student]
+
+    @property
+    def class_id(self) -> str:
+        return self.summary.class_id
+
+    @property
+    def instructor_name(self) -> str:
+        return self.summary.instructor_name
+
+    @property
+    def instructor_email(self) -> Optional[str]:
+        return self.instructor.email if self.instructor else None
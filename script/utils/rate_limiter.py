@@ -0,0 +1,90 @@
+import time
+import threading
+from collections import deque
+
+
+class RateLimiter:
+    """Thread-safe token bucket: ``rate`` requests per second, bursts up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Token bucket whose rate follows AIMD.
+
+    Each success adds ``increase`` req/s up to ``max_rate``; each throttled
+    response (429/5xx) multiplies the rate by ``decrease`` down to ``min_rate``
+    and, when the server sent ``Retry-After``, pauses every caller until then.
+    """
+
+    def __init__(self, rate: float, min_rate: float, max_rate: float, increase: float = 0.05,
+                 decrease: float = 0.5, burst: int = 1, window: float = 60.0):
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.window = window
+        self.throttled = 0
+        self._blocked_until = 0.0
+        self._recent = deque()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                blocked_for = self._blocked_until - time.monotonic()
+            if blocked_for <= 0:
+                break
+            time.sleep(blocked_for)
+        super().acquire()
+        with self._lock:
+            now = time.monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] < now - self.window:
+                self._recent.popleft()
+
+    def record_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self, retry_after: float = None):
+        with self._lock:
+            self._refill()
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def observed_rate(self) -> float:
+        """Requests per second actually let through over the last ``window`` seconds."""
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and self._recent[0] < now - self.window:
+                self._recent.popleft()
+            return len(self._recent) / self.window
+
+    def stats(self) -> dict:
+        observed = self.observed_rate()
+        with self._lock:
+            return {"rate": round(self.rate, 2), "observed_rate": round(observed, 2), "throttled": self.throttled}
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+from .static import DATA_DIR
+from .token_manager import decode_token_claims
+from . import metrics
+
+
+load_dotenv()
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, 'http_cache')
+# Used only when the gateway sends neither ETag nor Last-Modified.
+DEFAULT_TTL_SECONDS = float(os.getenv("ATLAS_RESPONSE_CACHE_TTL_HOURS", "24")) * 3600
+# Entries not refreshed for this long are deleted by prune().
+DEFAULT_MAX_AGE_SECONDS = float(os.getenv("ATLAS_RESPONSE_CACHE_MAX_AGE_DAYS", "30")) * 86400
+# Claims that change on every login without changing what the token may see.
+VOLATILE_CLAIMS = {"exp", "iat", "nbf", "jti", "auth_time"}
+
+
+def token_scope(jwt_token: str) -> str:
+    """Stable identifier for what a token is allowed to read, so a new login keeps its cache."""
+    claims = decode_token_claims(jwt_token)
+    if claims is None:
+        material = jwt_token or ""
+    else:
+        material = json.dumps({k: v for k, v in claims.items() if k not in VOLATILE_CLAIMS}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+class CachedResponse:
+    """One stored GET response: body plus the validators needed to revalidate it."""
+
+    __slots__ = ("url", "body", "etag", "last_modified", "stored_at")
+
+    def __init__(self, url: str, body: str, etag: str = None, last_modified: str = None, stored_at: float = None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """On-disk HTTP response cache, one JSON file per (URL, token scope).
+
+    Entries with an ETag or Last-Modified are always revalidated with a
+    conditional request; entries without validators are served as-is until
+    ``ttl`` expires.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL_SECONDS):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def _path(self, url: str, scope: str) -> str:
+        key = hashlib.sha256(f"{scope}\n{url}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def load(self, url: str, scope: str):
+        try:
+            with open(self._path(url, scope), "r", encoding='utf-8') as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if stored.get("url") != url:
+            return None
+        return CachedResponse(url, stored["body"], stored.get("etag"), stored.get("last_modified"),
+                              stored.get("stored_at"))
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        """A validator-less entry is usable without a request while younger than ``ttl``."""
+        return not entry.revalidatable and time.time() - entry.stored_at < self.ttl
+
+    def store(self, url: str, scope: str, body: str, etag: str = None, last_modified: str = None):
+        path = self._path(url, scope)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump({"url": url, "body": body, "etag": etag, "last_modified": last_modified,
+                       "stored_at": time.time()}, f)
+        os.replace(tmp_path, path)
+
+    def touch(self, url: str, scope: str, entry: CachedResponse):
+        """Restart the entry's age after a 304 so prune() keeps it."""
+        self.store(url, scope, entry.body, entry.etag, entry.last_modified)
+
+    def record(self, result: str, bytes_saved: int = 0):
+        with self._lock:
+            if result == "miss":
+                self.misses += 1
+            else:
+                self.hits += 1
+            self.bytes_saved += bytes_saved
+        metrics.increment("http_cache_requests_total", result=result)
+        if bytes_saved:
+            metrics.increment("http_cache_bytes_saved_total", bytes_saved)
+
+    def prune(self, max_age: float = DEFAULT_MAX_AGE_SECONDS) -> int:
+        cutoff = time.time() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "bytes_saved": self.bytes_saved
+            }
@@ -0,0 +1,153 @@
+import os
+import time
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from dotenv import load_dotenv
+from .static import DATA_DIR
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    import msvcrt
+
+
+load_dotenv()
+SCHEDULE_TIMEZONE = ZoneInfo(os.getenv("SCHEDULE_TIMEZONE", "America/New_York"))
+# Full runs (browser login allowed, every class re-checked) happen at these local times.
+FULL_RUN_TIMES = os.getenv("FULL_RUN_TIMES", "09:00,21:00")
+# Between full runs a token-only poll of getClasses looks for seat changes.
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", "300"))
+SCHEDULE_JITTER_SECONDS = float(os.getenv("SCHEDULE_JITTER_SECONDS", "30"))
+LOCK_PATH = os.path.join(DATA_DIR, 'scheduler.lock')
+# The OS releases the lock when its process dies; a lock held longer than this is reported as a possibly hung run.
+LOCK_STALE_SECONDS = float(os.getenv("SCHEDULER_LOCK_STALE_SECONDS", str(6 * 60 * 60)))
+# Wake up at least this often so clock jumps (sleep/hibernate, DST) are noticed.
+MAX_SLEEP_SECONDS = 60
+
+
+def parse_run_times(value: str) -> list[tuple[int, int]]:
+    times = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        hour, minute = part.split(":")
+        times.append((int(hour), int(minute)))
+    return sorted(times)
+
+
+def next_full_run(now: datetime, run_times: list[tuple[int, int]], tz=SCHEDULE_TIMEZONE) -> datetime:
+    """Return the first window in ``run_times`` (local to ``tz``) strictly after ``now``."""
+    local_now = now.astimezone(tz)
+    for day_offset in range(2):
+        day = local_now.date() + timedelta(days=day_offset)
+        for hour, minute in run_times:
+            candidate = datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz)
+            if candidate > local_now:
+                return candidate
+    raise ValueError("FULL_RUN_TIMES must contain at least one HH:MM time")
+
+
+def jittered(seconds: float, jitter: float) -> float:
+    return max(0.0, seconds + random.uniform(-jitter, jitter))
+
+
+def _try_lock(fd: int) -> bool:
+    try:
+        if msvcrt:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(fd: int):
+    if msvcrt:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def run_lock(path: str = LOCK_PATH, stale_after: float = LOCK_STALE_SECONDS):
+    """Hold an exclusive OS lock on ``path`` for the duration of a run; yields False if another run holds it.
+
+    The lock belongs to the process, so a run that is killed or crashes (or
+    whose console is closed) never blocks the ones after it. The file itself
+    stays on disk and holds the PID of the last run that took the lock.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT)
+    try:
+        if not _try_lock(fd):
+            try:
+                held_for = time.time() - os.path.getmtime(path)
+            except OSError:
+                held_for = 0.0
+            if held_for > stale_after:
+                print(f"Scheduler lock {path} has been held for {held_for / 3600:.1f}h; that run may be hung.")
+            yield False
+            return
+        try:
+            # Padded instead of truncated: byte 0 is locked on Windows.
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, f"{os.getpid():<20}\n".encode("ascii"))
+            yield True
+        finally:
+            _unlock(fd)
+    finally:
+        os.close(fd)
+
+
+def run_job(name: str, job) -> bool:
+    with run_lock() as acquired:
+        if not acquired:
+            print(f"Skipping {name}: another run is still in progress.")
+            return False
+        start = time.time()
+        try:
+            job()
+        except Exception as e:
+            print(f"Unhandled error in {name}: {e}")
+        print(f"{name.capitalize()} finished in {time.time() - start:.1f}s")
+        return True
+
+
+def run_scheduler(poll_job, full_job, poll_interval: float = POLL_INTERVAL_SECONDS,
+                  run_times: str = FULL_RUN_TIMES, jitter: float = SCHEDULE_JITTER_SECONDS,
+                  run_full_on_start: bool = True):
+    """Run ``full_job`` in each FULL_RUN_TIMES window and ``poll_job`` every ``poll_interval`` in between.
+
+    Jobs never overlap: the loop runs them one at a time and ``run_lock`` keeps
+    a second process (e.g. a manual ``--once``) from running alongside.
+    """
+    times = parse_run_times(run_times)
+    now = datetime.now(SCHEDULE_TIMEZONE)
+    next_full = now if run_full_on_start else next_full_run(now, times)
+    next_poll = now + timedelta(seconds=jittered(poll_interval, jitter))
+    print(f"Scheduler started: polling every ~{poll_interval / 60:.0f} min, "
+          f"full runs at {run_times} ({SCHEDULE_TIMEZONE.key})")
+
+    while True:
+        now = datetime.now(SCHEDULE_TIMEZONE)
+        if now >= next_full:
+            print(f"\n{'=' * 50}\nFULL RUN at {now:%Y-%m-%d %H:%M:%S %Z}\n{'=' * 50}")
+            run_job("full run", full_job)
+            now = datetime.now(SCHEDULE_TIMEZONE)
+            # Jitter only delays, so a window is never run early.
+            next_full = next_full_run(now, times) + timedelta(seconds=random.uniform(0, jitter))
+            next_poll = now + timedelta(seconds=jittered(poll_interval, jitter))
+            print(f"Next full run: {next_full:%Y-%m-%d %H:%M:%S %Z}")
+        elif now >= next_poll:
+            run_job("poll", poll_job)
+            next_poll = datetime.now(SCHEDULE_TIMEZONE) + timedelta(seconds=jittered(poll_interval, jitter))
+        else:
+            wait = (min(next_full, next_poll) - now).total_seconds()
+            time.sleep(min(MAX_SLEEP_SECONDS, max(0.0, wait)))
@@ -0,0 +1,88 @@
+import json
+import time
+import sqlite3
+import threading
+
+from .dedupe_store import DEFAULT_DB_PATH, DEFAULT_BATCH_SIZE
+
+
+class ClassSnapshot:
+    __slots__ = ("occupied_seats", "student_ids")
+
+    def __init__(self, occupied_seats: int, student_ids: set):
+        self.occupied_seats = occupied_seats
+        self.student_ids = student_ids
+
+
+class ClassSnapshotStore:
+    """Last seen seat count and enrolled student IDs per class.
+
+    Lives next to the done-class table in the same SQLite file. Snapshots are
+    loaded into memory once per run and updates are written in batches.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS class_snapshots ("
+            "class_id TEXT PRIMARY KEY, occupied_seats INTEGER, student_ids TEXT, updated_at REAL)"
+        )
+        self._conn.commit()
+
+        self._snapshots = {
+            class_id: ClassSnapshot(seats, set(json.loads(student_ids)))
+            for class_id, seats, student_ids in self._conn.execute(
+                "SELECT class_id, occupied_seats, student_ids FROM class_snapshots"
+            )
+        }
+
+    def get(self, class_id):
+        return self._snapshots.get(str(class_id).strip())
+
+    def seats_changed(self, class_id, occupied_seats: int) -> bool:
+        snapshot = self.get(class_id)
+        return snapshot is None or snapshot.occupied_seats != occupied_seats
+
+    def update(self, class_id, occupied_seats: int, student_ids):
+        class_id = str(class_id).strip()
+        snapshot = ClassSnapshot(occupied_seats, set(student_ids))
+        with self._lock:
+            self._snapshots[class_id] = snapshot
+            self._pending[class_id] = snapshot
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        now = time.time()
+        rows = [
+            (class_id, snapshot.occupied_seats, json.dumps(sorted(snapshot.student_ids)), now)
+            for class_id, snapshot in self._pending.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO class_snapshots (class_id, occupied_seats, student_ids, updated_at) "
+                "VALUES (?, ?, ?, ?)", rows
+            )
+        self._pending = {}
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,48 +1,64 @@
-from selenium.webdriver.common.by import By
+import os
+from dotenv import load_dotenv
 
-BASE_URL = "https://atlas-api-gateway.heart.org/classManagement/v2"
-BASE_URL_2 = "https://atlas-api-gateway.heart.org/orgManagement/v1/organisation"
+load_dotenv()
+# Per-organisation state (token, stores, caches, metrics); the multi-tenant runner gives each tenant its own.
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DATA_DIR = os.getenv("DATA_DIR", DEFAULT_DATA_DIR)
+ORG_NAME = os.getenv("ORG_NAME", "Shell CPR, LLC.")
+PROFILE_NAME = os.getenv("PROFILE_NAME", "Nathaniel Shell")
+ATLAS_PARENT_ID = os.getenv("ATLAS_PARENT_ID", "18260")
+ATLAS_PARENT_ORG_CODE = os.getenv("ATLAS_PARENT_ORG_CODE", "KY21007")
+
+# Overridable so runs can be pointed at a local stand-in (see benchmarks/mock_server.py).
+ATLAS_API_BASE = os.getenv("ATLAS_API_BASE", "https://atlas-api-gateway.heart.org").rstrip("/")
+BREVO_API_BASE = os.getenv("BREVO_API_BASE", "https://api.brevo.com").rstrip("/")
+
+BASE_URL = f"{ATLAS_API_BASE}/classManagement/v2"
+BASE_URL_2 = f"{ATLAS_API_BASE}/orgManagement/v1/organisation"
+BREVO_URL = f"{BREVO_API_BASE}/v3/smtp/email"
+
+ATLAS_DEFAULT_HEADERS = {
+    'accept': 'application/json',
+    'accept-language': 'en-US,en;q=0.9',
+    'content-type': 'application/json',
+    'ext_id': 'dacbf678-f0cd-4f43-aaf0-7cd5058fb9f9',
+    'origin': 'https://atlas.heart.org',
+    'priority': 'u=1, i',
+    'referer': 'https://atlas.heart.org/',
+    'sec-ch-ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"',
+    'sec-fetch-dest': 'empty',
+    'sec-fetch-mode': 'cors',
+    'sec-fetch-site': 'same-site',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
+}
+
+# Values of selenium's By.XPATH / By.ID / By.CSS_SELECTOR, so importing this module does not load selenium.
+XPATH = "xpath"
+ID = "id"
+CSS_SELECTOR = "css selector"
 
 class Locators:
     # Login Page Locators
-    SIGN_IN_BUTTON = (By.XPATH, "(//button[text()= 'Sign In | Sign Up'])[1]")
-    USERNAME_INPUT = (By.ID, "Email")
-    PASSWORD_INPUT = (By.ID, "Password")
-    SUBMIT_BUTTON = (By.ID, "btnSignIn")
-    PROFILE_ICON = (By.XPATH, "//span[@title= 'Nathaniel Shell' and contains(@class, 'Header_userName')]")
+    SIGN_IN_BUTTON = (XPATH, "(//button[text()= 'Sign In | Sign Up'])[1]")
+    USERNAME_INPUT = (ID, "Email")
+    PASSWORD_INPUT = (ID, "Password")
+    SUBMIT_BUTTON = (ID, "btnSignIn")
+    PROFILE_ICON = (XPATH, f"//span[@title= '{PROFILE_NAME}' and contains(@class, 'Header_userName')]")
 
     # Dashboard Page Locators
-    CLASSES_NAV = (By.ID, "Classes")
-    TC_DROPDOWN = (By.CSS_SELECTOR, "button[title='Training Center/Site Classes']")
-    SELECTED_ORGANIZATION = (By.XPATH, "//div[text()='Shell CPR, LLC.']")
-    ORGANIZATION_INPUT = (By.CSS_SELECTOR, "input[aria-label=Organization]")
-    ORGANIZATION_TO_SELECT = (By.CSS_SELECTOR, "div[title='Shell CPR, LLC.']")
+    CLASSES_NAV = (ID, "Classes")
+    TC_DROPDOWN = (CSS_SELECTOR, "button[title='Training Center/Site Classes']")
+    SELECTED_ORGANIZATION = (XPATH, f"//div[text()='{ORG_NAME}']")
+    ORGANIZATION_INPUT = (CSS_SELECTOR, "input[aria-label=Organization]")
+    ORGANIZATION_TO_SELECT = (CSS_SELECTOR, f"div[title='{ORG_NAME}']")
 
 
 class ApiEndpoints:
     GET_CLASS_DETAILS = lambda x: f"{BASE_URL}/classes/{x}"
-    GET_CLASSES = lambda x: f"{BASE_URL}/getClasses?size=100&page={x}&sort=startDateTime,desc"
-    GET_CLASS_STUDENTS = lambda x: f"{BASE_URL}/classes/{x}/students?page=1&sort=firstName,asc&size=10&enrollmentStatus=ENROLLED&status=IN_PROGRESS"
-    GET_INSTRUCTOR_INFO = lambda x: f"{BASE_URL_2}/alignments?page=1&nameOrEmailOrInstructorId={x}&roleId=17&roleName=INSTRUCTOR&parentId=18260&expiryStatus=ACTIVE&sort=lastName,asc&size=10"
-    GET_COORDINATOR_INFO = lambda x, y: f"{BASE_URL_2}?page=1&sort=name,asc&size=10&status=ACTIVE&orgCodeOrName={x}&orgType={y}&all=true&parentOrgCodeOrName=KY21007&publicAccess=false"
-
-
-    def get_headers(self: str) -> dict:
-        headers = {
-            'accept': 'application/json',
-            'accept-language': 'en-US,en;q=0.9',
-            'content-type': 'application/json',
-            'ext_id': 'dacbf678-f0cd-4f43-aaf0-7cd5058fb9f9',
-            'origin': 'https://atlas.heart.org',
-            'priority': 'u=1, i',
-            'referer': 'https://atlas.heart.org/',
-            'sec-ch-ua': '"Google Chrome";v="143", "Chromium";v="143", "Not A(Brand";v="24"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"Windows"',
-            'sec-fetch-dest': 'empty',
-            'sec-fetch-mode': 'cors',
-            'sec-fetch-site': 'same-site',
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36',
-            'x-jwt-token': self
-        }
-        return headers
+    GET_CLASSES = lambda x, size=100: f"{BASE_URL}/getClasses?size={size}&page={x}&sort=startDateTime,desc"
+    GET_CLASS_STUDENTS = lambda x, page=1, size=10: f"{BASE_URL}/classes/{x}/students?page={page}&sort=firstName,asc&size={size}&enrollmentStatus=ENROLLED&status=IN_PROGRESS"
+    GET_INSTRUCTOR_INFO = lambda x: f"{BASE_URL_2}/alignments?page=1&nameOrEmailOrInstructorId={x}&roleId=17&roleName=INSTRUCTOR&parentId={ATLAS_PARENT_ID}&expiryStatus=ACTIVE&sort=lastName,asc&size=10"
+    GET_COORDINATOR_INFO = lambda x, y: f"{BASE_URL_2}?page=1&sort=name,asc&size=10&status=ACTIVE&orgCodeOrName={x}&orgType={y}&all=true&parentOrgCodeOrName={ATLAS_PARENT_ORG_CODE}&publicAccess=false"
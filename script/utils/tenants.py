@@ -0,0 +1,111 @@
+import os
+import sys
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from .static import DATA_DIR
+
+
+load_dotenv()
+TENANTS_FILE = os.getenv("TENANTS_FILE", os.path.join(DATA_DIR, 'tenants.json'))
+TENANTS_DATA_DIR = os.path.join(DATA_DIR, 'tenants')
+TENANT_MAX_WORKERS = int(os.getenv("TENANT_MAX_WORKERS", "4"))
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+# tenants.json key -> environment variable read by the pipeline modules.
+TENANT_SETTINGS = {
+    "org_name": "ORG_NAME",
+    "profile_name": "PROFILE_NAME",
+    "parent_id": "ATLAS_PARENT_ID",
+    "parent_org_code": "ATLAS_PARENT_ORG_CODE",
+    "username": "AHA_USERNAME",
+    "password": "AHA_PASSWORD",
+    "copy_to": "NATHAN_EMAIL",
+    "sender_email": "SENDER_EMAIL",
+    "sender_name": "SENDER_NAME",
+    "signature_file": "EMAIL_SIGNATURE_FILE",
+    "data_dir": "DATA_DIR",
+}
+# Everything that identifies an organisation is required, so none inherits another's portal
+# account name (used to detect a completed login), sender, copy recipient or signature.
+REQUIRED_SETTINGS = ("name", "org_name", "profile_name", "parent_id", "parent_org_code", "username", "password",
+                     "copy_to", "sender_email", "sender_name", "signature_file")
+# Request budgets every tenant process would otherwise claim in full; split so the hosts see one deployment's rate.
+SHARED_RATE_SETTINGS = {
+    "ATLAS_RATE_INITIAL": "5",
+    "ATLAS_RATE_MAX": "20",
+    "BREVO_RATE_PER_SECOND": "5",
+}
+
+
+def load_tenants(path: str = TENANTS_FILE) -> list[dict]:
+    """Read the tenant list; values may reference environment variables as ``${NAME}``.
+
+    A relative ``signature_file`` is resolved against the tenants file's directory.
+    """
+    with open(path, "r", encoding='utf-8') as f:
+        config = json.load(f)
+    tenants = config.get("tenants", []) if isinstance(config, dict) else config
+    names = set()
+    for tenant in tenants:
+        missing = [key for key in REQUIRED_SETTINGS if not tenant.get(key)]
+        if missing:
+            raise ValueError(f"Tenant {tenant.get('name', '?')} is missing {', '.join(missing)}")
+        if tenant["name"] in names:
+            raise ValueError(f"Duplicate tenant name {tenant['name']}")
+        names.add(tenant["name"])
+        signature = os.path.join(os.path.dirname(os.path.abspath(path)), os.path.expandvars(tenant["signature_file"]))
+        if not os.path.isfile(signature):
+            raise ValueError(f"Tenant {tenant['name']} signature_file {signature} does not exist")
+        tenant["signature_file"] = signature
+    return tenants
+
+
+def tenant_env(tenant: dict, concurrent: int = 1) -> dict:
+    """Environment for one tenant's worker process."""
+    env = dict(os.environ)
+    for key, variable in TENANT_SETTINGS.items():
+        if tenant.get(key) is not None:
+            env[variable] = os.path.expandvars(str(tenant[key]))
+    data_dir = env["DATA_DIR"] if tenant.get("data_dir") else os.path.join(TENANTS_DATA_DIR, tenant["name"])
+    env["DATA_DIR"] = data_dir
+    env["METRICS_DIR"] = os.path.join(data_dir, 'metrics')
+    env["CHROME_PROFILE_DIR"] = os.path.join(data_dir, 'chrome-dir')
+    for variable, default in SHARED_RATE_SETTINGS.items():
+        env[variable] = str(float(os.getenv(variable, default)) / max(1, concurrent))
+    env.update({key: os.path.expandvars(str(value)) for key, value in tenant.get("env", {}).items()})
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def run_tenant(tenant: dict, env: dict, full_scan: bool = True) -> int:
+    """Run one pass for ``tenant`` in its own process, prefixing its output with the tenant name."""
+    args = [sys.executable, MAIN_SCRIPT, "--once" if full_scan else "--poll"]
+    process = subprocess.Popen(args, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                               text=True, encoding='utf-8', errors='replace')
+    for line in process.stdout:
+        print(f"[{tenant['name']}] {line.rstrip()}")
+    return process.wait()
+
+
+def run_tenants(tenants: list[dict], full_scan: bool = True, max_workers: int = TENANT_MAX_WORKERS) -> dict:
+    """Run every tenant in parallel worker processes; returns each tenant's exit code."""
+    if not tenants:
+        print("No tenants configured.")
+        return {}
+    concurrent = min(max_workers, len(tenants))
+    with ThreadPoolExecutor(max_workers=concurrent, thread_name_prefix="tenant") as pool:
+        futures = {
+            tenant["name"]: pool.submit(run_tenant, tenant, tenant_env(tenant, concurrent), full_scan)
+            for tenant in tenants
+        }
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except OSError as e:
+                print(f"Failed to start tenant {name}: {e}")
+                results[name] = None
+    print(f"Tenant runs finished: {results}")
+    return results
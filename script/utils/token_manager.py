@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import base64
+from dotenv import load_dotenv
+from .static import DATA_DIR
+from .cassette import cassette, REPLAY_TOKEN
+from . import metrics
+
+
+load_dotenv()
+TOKEN_PATH = os.path.join(DATA_DIR, 'token.json')
+# Treat tokens this close to expiry as expired so a run never starts with one about to lapse.
+EXPIRY_MARGIN_SECONDS = int(os.getenv("TOKEN_EXPIRY_MARGIN_SECONDS", "600"))
+# File modes mean nothing on Windows, so there the token is encrypted for the current user with DPAPI.
+PROTECT_TOKEN = os.name == "nt"
+CRYPTPROTECT_UI_FORBIDDEN = 0x1
+
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    """Encrypt (or decrypt) ``data`` for the current Windows user with CryptProtectData."""
+    import ctypes
+    from ctypes import wintypes
+
+    class DataBlob(ctypes.Structure):
+        _fields_ = [("cbData", wintypes.DWORD), ("pbData", ctypes.POINTER(ctypes.c_char))]
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DataBlob()
+    crypt = ctypes.windll.crypt32.CryptProtectData if protect else ctypes.windll.crypt32.CryptUnprotectData
+    if not crypt(ctypes.byref(blob_in), None, None, None, None, CRYPTPROTECT_UI_FORBIDDEN, ctypes.byref(blob_out)):
+        raise ctypes.WinError()
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+
+def decode_token_claims(token: str):
+    """Return the (unverified) claims of a JWT, or None if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def decode_token_expiry(token: str):
+    """Return the ``exp`` claim of a JWT as epoch seconds, or None if it cannot be read."""
+    try:
+        return int(decode_token_claims(token)["exp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def load_cached_token():
+    try:
+        with open(TOKEN_PATH, "r", encoding='utf-8') as f:
+            stored = json.load(f)
+        token = stored.get("userToken")
+        if stored.get("protectedToken"):
+            token = _dpapi(base64.b64decode(stored["protectedToken"]), protect=False).decode("utf-8")
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError, ValueError, OSError):
+        return None
+    if not token:
+        return None
+
+    expires_at = decode_token_expiry(token)
+    if expires_at is None or expires_at - EXPIRY_MARGIN_SECONDS <= time.time():
+        print("Cached JWT token is expired or unreadable.")
+        return None
+    return token
+
+
+def save_token(token: str):
+    if PROTECT_TOKEN:
+        try:
+            protected = _dpapi(token.encode("utf-8"), protect=True)
+        except OSError as e:
+            print(f"Could not encrypt the JWT token, not caching it: {e}")
+            return
+        stored = {"protectedToken": base64.b64encode(protected).decode("ascii")}
+    else:
+        stored = {"userToken": token}
+    stored["exp"] = decode_token_expiry(token)
+    os.makedirs(os.path.dirname(TOKEN_PATH), exist_ok=True)
+    # Create the file owner-only before the token is written to it (POSIX; Windows relies on DPAPI).
+    fd = os.open(TOKEN_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding='utf-8') as f:
+        json.dump(stored, f)
+    os.chmod(TOKEN_PATH, 0o600)
+
+
+def invalidate_token():
+    try:
+        os.remove(TOKEN_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def capture_token_with_browser():
+    from .util import get_undetected_driver, timed_phase
+    from .automation import capture_jwt_token, login, navigate_to_class_listings
+
+    with timed_phase("driver_startup"):
+        driver = get_undetected_driver(headless=True)
+    if driver is None:
+        return None
+    try:
+        login(driver)
+        navigate_to_class_listings(driver)
+        token = capture_jwt_token(driver)
+    finally:
+        driver.quit()
+    if token:
+        print("JWT token captured successfully.")
+        save_token(token)
+    return token
+
+
+def get_jwt_token(force_login: bool = False):
+    """Return a valid JWT, reusing the cached one unless it is missing, expired or ``force_login`` is set."""
+    if cassette.replaying:
+        return REPLAY_TOKEN
+    if not force_login:
+        token = load_cached_token()
+        if token:
+            print("Using cached JWT token.")
+            metrics.increment("token_source_total", source="cache")
+            return token
+    metrics.increment("token_source_total", source="browser")
+    with metrics.span("browser_login"):
+        return capture_token_with_browser()
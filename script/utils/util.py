@@ -1,11 +1,15 @@
 import os
+import json
 import time
 import logging
 
 from typing import Optional
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver import ActionChains
 from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import OperationSystemManager, ChromeType
+from . import metrics
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.service import Service
@@ -15,27 +19,44 @@ from selenium.common.exceptions import (
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DRIVER_CACHE_PATH = os.path.join(BASE_DIR, 'data', 'chromedriver.json')
+# Pin a specific chromedriver release; by default the one matching the installed Chrome is used.
+CHROMEDRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION")
+# Each tenant gets its own profile so parallel logins do not fight over Chrome's profile lock.
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", rf'{BASE_DIR}\chrome-dir')
+SCROLL_INTO_VIEW_JS = "arguments[0].scrollIntoView({behavior: 'instant', block: 'center', inline: 'nearest'})"
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Duration in seconds of each phase timed with ``timed_phase`` during this process.
+PHASE_TIMINGS = {}
+
+
+@contextmanager
+def timed_phase(name: str):
+    """Log and record how long the wrapped block takes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_TIMINGS[name] = elapsed
+        metrics.observe(name, elapsed)
+        logger.info(f"{name} took {elapsed:.2f}s")
+
 
 def input_element(driver, by_locator, text: str, timeout: int = 10) -> bool:
     """Input text with comprehensive exception handling and validation."""
     try:
         element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
-        driver.execute_script(
-            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'nearest'})", element)
-        time.sleep(0.5)
+        driver.execute_script(SCROLL_INTO_VIEW_JS, element)
 
         # Clear the field safely
         element.clear()
-        time.sleep(0.2)
 
-        # Input the text
+        # Input the text and wait until the field actually holds it
         element.send_keys(text)
-        time.sleep(0.3)
+        WebDriverWait(driver, timeout).until(lambda d: element.get_attribute("value") == text)
 
         return True
     except TimeoutException:
@@ -55,7 +76,6 @@ def move_to_element(driver, locator, timeout: int = 10) -> bool:
         element = WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(locator))
         actions = ActionChains(driver)
         actions.move_to_element(element).perform()
-        time.sleep(0.3)
         return True
     except TimeoutException:
         logger.error(f"Element not visible for hover within {timeout} seconds: {locator}")
@@ -65,13 +85,39 @@ def move_to_element(driver, locator, timeout: int = 10) -> bool:
         return False
 
 
+def resolve_chromedriver_path() -> str:
+    """Return a chromedriver binary, reusing the cached one while Chrome's version is unchanged."""
+    try:
+        chrome_version = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception as e:
+        logger.warning(f"Could not detect the installed Chrome version: {e}")
+        chrome_version = None
+    wanted = {"chrome_version": chrome_version, "pinned_version": CHROMEDRIVER_VERSION}
+
+    try:
+        with open(DRIVER_CACHE_PATH, "r", encoding='utf-8') as f:
+            cached = json.load(f)
+        if (os.path.exists(cached.get("path", ""))
+                and all(cached.get(key) == value for key, value in wanted.items())):
+            return cached["path"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    path = ChromeDriverManager(driver_version=CHROMEDRIVER_VERSION).install()
+    os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+    with open(DRIVER_CACHE_PATH, "w", encoding='utf-8') as f:
+        json.dump({"path": path, **wanted}, f)
+    logger.info(f"Resolved chromedriver {path} for Chrome {chrome_version}")
+    return path
+
+
 def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optional[webdriver.Chrome]:
     """Create undetected Chrome driver with comprehensive error handling."""
     for attempt in range(max_retries):
         driver = None
         try:
             options = webdriver.ChromeOptions()
-            path = rf'{BASE_DIR}\chrome-dir'
+            path = CHROME_PROFILE_DIR
 
             # Ensure chrome-dir exists
             if not os.path.exists(path):
@@ -112,12 +158,9 @@ def get_undetected_driver(headless: bool = False, max_retries: int = 3) -> Optio
             options.add_experimental_option('useAutomationExtension', False)
 
             # Initialize Chrome driver
-            service = Service(ChromeDriverManager().install())
+            service = Service(resolve_chromedriver_path())
             driver = webdriver.Chrome(service=service, options=options)
 
-            # Allow the browser to fully initialize
-            time.sleep(3)
-
             # Enhanced fingerprinting protection
             stealth_js = """
             Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
@@ -164,13 +207,30 @@ def check_element_exists(driver, by_locator, timeout: int = 3) -> bool:
         return False
 
 
+def wait_for_any(driver, locators: list, timeout: int = 10) -> Optional[int]:
+    """Wait until one of ``locators`` is visible and return its index, or None on timeout."""
+    def first_visible(d):
+        for index, locator in enumerate(locators):
+            try:
+                if EC.visibility_of_element_located(locator)(d):
+                    # until() only returns truthy values, so wrap the index (0 would be falsy).
+                    return (index,)
+            except (NoSuchElementException, WebDriverException):
+                continue
+        return False
+
+    try:
+        return WebDriverWait(driver, timeout).until(first_visible)[0]
+    except TimeoutException:
+        return None
+
+
 def wait_for_page_load(driver, timeout: int = 30) -> bool:
     """Wait for page to fully load with exception handling."""
     try:
         WebDriverWait(driver, timeout).until(
             lambda d: d.execute_script("return document.readyState") == "complete"
         )
-        time.sleep(1)  # Additional buffer
         return True
     except TimeoutException:
         logger.warning(f"Page load timeout after {timeout} seconds")
@@ -204,11 +264,8 @@ def click_element(driver, by_locator, timeout: int = 10) -> bool:
     """Click element with exception handling and retry logic."""
     try:
         element = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(by_locator))
-        driver.execute_script(
-            "arguments[0].scrollIntoView({behavior: 'smooth', block: 'center', inline: 'nearest'})", element)
-        time.sleep(0.5)  # Allow scroll to complete
+        driver.execute_script(SCROLL_INTO_VIEW_JS, element)
         element.click()
-        time.sleep(0.5)
         return True
     except TimeoutException:
         logger.error(f"Element not found for click within {timeout} seconds: {by_locator}")